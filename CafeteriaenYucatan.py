@@ -1,44 +1,33 @@
 import streamlit as st
-import pandas as pd
 import pydeck as pdk
-import json
-import plotly.express as px
+
+import charts
+from coffee_data import hourly_traffic, load_coffee_sales, load_top_products
+from geo import Deck, load_municipios_layer
+from paged_table import paged_dataframe
+import profiling
+from registry import warm_up
+
+# Precarga en segundo plano de todos los datos del servidor (una vez por proceso)
+warm_up()
+# Tiempos por etapa de esta ejecución (panel opcional en la barra lateral y log)
+profiling.start('CafeteriaenYucatan')
 
 # Load the modified Excel file
 file_path = 'Coffee Shop Sales_Modified.xlsx'
 try:
-    df = pd.read_excel(file_path)
+    # Store coordinates, municipality and CVEGEO come from a location table joined once at load
+    with profiling.stage('load') as etapa:
+        df = load_coffee_sales(file_path)
+        etapa.rows_out = len(df)
 except FileNotFoundError:
     st.error(f"Error: The file '{file_path}' was not found. Please ensure it's in the correct location.")
     st.stop()
 
 st.title("Cafeterías ubicadas en Yucatán ☕")
 
-# Ensure 'store_name' column exists and 'state store location' was added
-if 'store_location' in df.columns and 'store_name' not in df.columns:
-    df.rename(columns={'store_location': 'store_name'}, inplace=True)
-
-# Create a dictionary for state store location to lat/lon mapping
-# Approximate coordinates for the specified locations in Yucatán, Mexico
-location_coordinates = {
-    'MOTUL': {'lat': 21.1667, 'lon': -89.2667},
-    'TICUL': {'lat': 20.5833, 'lon': -89.5333},
-    'MERIDA': {'lat': 20.9670, 'lon': -89.6247}
-}
-
-# Add 'latitude' and 'longitude' columns to the DataFrame
-if 'state store location' in df.columns:
-    # Ensure state store location column values are clean and in line with dictionary keys
-    df['state store location'] = df['state store location'].str.upper().str.strip()
-    df['latitude'] = df['state store location'].map(lambda x: location_coordinates.get(x, {}).get('lat'))
-    df['longitude'] = df['state store location'].map(lambda x: location_coordinates.get(x, {}).get('lon'))
-else:
+if 'state store location' not in df.columns:
     st.warning("Column 'state store location' not found. Cannot map store locations.")
-    df['latitude'] = None
-    df['longitude'] = None
-
-# Drop rows where latitude or longitude could not be determined
-df.dropna(subset=['latitude', 'longitude'], inplace=True)
 
 # Load GeoJSON for municipalities (assuming Yucatan.geojson is in the root directory)
 # and dfMunicipios.csv is also available
@@ -46,42 +35,16 @@ municipios_yucatan_path = 'Yucatan.geojson'
 municipios_datos_path = 'municipiosDatos.csv'
 
 try:
-    with open(municipios_yucatan_path) as archivo:
-        municipios_json = json.load(archivo)
-    dfMunicipios = pd.read_csv(municipios_datos_path)
-    dfMunicipios.drop('Unnamed: 0', axis=1, inplace=True)
-
-    # Create a copy of the GeoJSON data to modify it
-    enriched_municipios_json = json.loads(json.dumps(municipios_json))
-
-    # Merge RandomNumbers from dfMunicipios into the GeoJSON properties
-    for feature in enriched_municipios_json['features']:
-        municipio_name = feature['properties']['NOMGEO']
-        matching_row = dfMunicipios[dfMunicipios['Municipio'] == municipio_name]
-        if not matching_row.empty:
-            random_number = int(matching_row['RandomNumbers'].iloc[0])
-            feature['properties']['RandomNumbers'] = random_number
-        else:
-            feature['properties']['RandomNumbers'] = 0  # Default value if no match found
-
-    geojson_layer = pdk.Layer(
-        "GeoJsonLayer",
-        enriched_municipios_json,
-        filled=True,
-        get_fill_color=[
-            "(properties.RandomNumbers / 1000) * 255",  # Red component (scaled by value)
-            "(properties.RandomNumbers / 1000) * 255",  # Green component
-            "255 - (properties.RandomNumbers / 1000) * 255",  # Blue component (inverse scaled)
-            100  # Alpha transparency (reduced for better visibility of points)
-        ],
-        get_line_color=[0, 0, 0, 100],
-        get_line_width=1,
-        stroked=True,
-        opacity=0.5,
-        extruded=False,
-        auto_highlight=True,
-        pickable=True
-    )
+    # Static base layer: RandomNumbers merged into the municipality polygons (0 if no match found),
+    # simplified for the store-level zoom (9). Built and serialized once per process and shared by
+    # every session, so filter changes only recompute the scatter points below.
+    with profiling.stage('layer'):
+        geojson_layer = load_municipios_layer(
+            municipios_yucatan_path, municipios_datos_path, zoom=9,
+            fill_alpha=100,  # Alpha transparency (reduced for better visibility of points)
+            line_alpha=100,
+            opacity=0.5
+        )
 except FileNotFoundError:
     st.warning("GeoJSON or municipiosDatos.csv files not found. The base map will not be displayed.")
     geojson_layer = None
@@ -110,16 +73,20 @@ selected_product_types = st.sidebar.multiselect(
 )
 
 # Apply filters to the DataFrame
-filtered_df = df[
-    df['store_name'].isin(selected_store_names) &
-    df['product_type'].isin(selected_product_types)
-]
+with profiling.stage('filter', rows_in=len(df)) as etapa:
+    filtered_df = df[
+        df['store_name'].isin(selected_store_names) &
+        df['product_type'].isin(selected_product_types)
+    ]
+    etapa.rows_out = len(filtered_df)
 
 st.subheader("Ubicación de las sucursales:")
 
 if not filtered_df.empty:
     # Aggregate data to get unique store locations and their details
-    store_locations_for_map = filtered_df[['store_name', 'state store location', 'latitude', 'longitude']].drop_duplicates()
+    with profiling.stage('aggregate', rows_in=len(filtered_df)) as etapa:
+        store_locations_for_map = filtered_df[['store_name', 'state store location', 'latitude', 'longitude']].drop_duplicates()
+        etapa.rows_out = len(store_locations_for_map)
 
     # Set the initial view state for the map, centered around the mean coordinates of all stores,
     # or a default view for Yucatan if no stores are selected.
@@ -140,13 +107,12 @@ if not filtered_df.empty:
         pitch=45
     )
 
-    # Create a PyDeck Layer for the Scatterplot
-    scatterplot_layer = pdk.Layer(
-        'ScatterplotLayer',
+    # Create a PyDeck Layer for the Scatterplot (binned into a grid if there are too many points)
+    scatterplot_layer = charts.point_layer(
         store_locations_for_map,
-        get_position='[longitude, latitude]',
         get_color='[200, 30, 0, 160]',
         get_radius=500,  # Radius in meters
+        radius_units='meters',
         pickable=True
         #tooltip={
         #    "text": "Store: {store_name}\nLocation: {state store location}\nLat: {latitude}\nLon: {longitude}"
@@ -160,7 +126,7 @@ if not filtered_df.empty:
     layers_to_render.append(scatterplot_layer)
 
     # Create a Deck object
-    r = pdk.Deck(
+    r = Deck(
         map_style='mapbox://styles/mapbox/light-v9',
         initial_view_state=view_state,
         layers=layers_to_render,
@@ -171,58 +137,61 @@ if not filtered_df.empty:
     )
 
     # Render the map
-    st.pydeck_chart(r)
+    with profiling.stage('charts'):
+        st.pydeck_chart(r)
 else:
     st.warning("No store locations to display based on current filters.")
 
 st.subheader("Información de ventas:")
 if not filtered_df.empty:
-    st.dataframe(filtered_df)
+    with profiling.stage('table', rows_in=len(filtered_df)):
+        paged_dataframe(filtered_df, key='ventas_cafeterias', file_name='ventas_cafeterias.csv')
 else:
     st.warning("No data available for the selected filters.")
 
 # --- New Chart: Most Sold Products ---
 st.subheader("Productos más vendidos (filtrado):")
 if not filtered_df.empty:
-    top_products_filtered = filtered_df.groupby('product_detail')['transaction_qty'].sum().nlargest(10).reset_index()
+    with profiling.stage('aggregate', rows_in=len(filtered_df)) as etapa:
+        # Partial sums per store and product type, merged for the selection (no groupby per rerun)
+        top_products_filtered = load_top_products(file_path).top(
+            10, 'transaction_qty', {'store_name': selected_store_names, 'product_type': selected_product_types}
+        ).reset_index()
+        etapa.rows_out = len(top_products_filtered)
     top_products_filtered.rename(columns={'transaction_qty': 'total_quantity_sold'}, inplace=True)
 
-    fig_products = px.bar(
-        top_products_filtered,
-        x='product_detail',
-        y='total_quantity_sold',
-        title='Top 10 Productos más vendidos por cantidad',
-        labels={'product_detail': 'Producto', 'total_quantity_sold': 'Cantidad Total Vendida'}
-    )
-    fig_products.update_layout(xaxis_title_standoff=25)
-    fig_products.update_xaxes(tickangle=45)
-    st.plotly_chart(fig_products, width='stretch')
+    with profiling.stage('charts'):
+        fig_products = charts.bar(
+            top_products_filtered,
+            x='product_detail',
+            y='total_quantity_sold',
+            title='Top 10 Productos más vendidos por cantidad',
+            labels={'product_detail': 'Producto', 'total_quantity_sold': 'Cantidad Total Vendida'}
+        )
+        fig_products.update_layout(xaxis_title_standoff=25)
+        fig_products.update_xaxes(tickangle=45)
+        st.plotly_chart(fig_products, width='stretch')
 else:
     st.warning("No hay datos de productos para mostrar con los filtros seleccionados.")
 
 # --- New Chart: Hourly Traffic ---
 st.subheader("Afluencia por horas (filtrado):")
 if not filtered_df.empty:
-    # Ensure 'transaction_time' is in datetime format to extract hour
-    df['transaction_time'] = pd.to_datetime(df['transaction_time'], format='%H:%M:%S').dt.time # Convert to just time objects for consistency if it's mixed with dates
-    
-    # Extract hour from transaction_time, handle if it's already a time object
-    # Need to re-process filtered_df to ensure 'hour' column is available
-    filtered_df_with_hour = filtered_df.copy()
-    filtered_df_with_hour['hour'] = pd.to_datetime(filtered_df_with_hour['transaction_time'], format='%H:%M:%S').dt.hour
-
-    hourly_traffic = filtered_df_with_hour.groupby('hour')['transaction_id'].count().reset_index()
-    hourly_traffic.rename(columns={'transaction_id': 'number_of_transactions'}, inplace=True)
-
-    fig_hourly = px.line(
-        hourly_traffic,
-        x='hour',
-        y='number_of_transactions',
-        title='Número de Transacciones por Hora',
-        labels={'hour': 'Hora del Día', 'number_of_transactions': 'Número de Transacciones'}
-    )
-    fig_hourly.update_layout(xaxis = dict(tickmode = 'linear', dtick = 1))
-    st.plotly_chart(fig_hourly, width='stretch')
+    # 'hour' is parsed from transaction_time once at load, count it with a bincount
+    with profiling.stage('aggregate', rows_in=len(filtered_df)) as etapa:
+        hourly = hourly_traffic(filtered_df)
+        etapa.rows_out = len(hourly)
+
+    with profiling.stage('charts'):
+        fig_hourly = charts.line(
+            hourly,
+            x='hour',
+            y='number_of_transactions',
+            title='Número de Transacciones por Hora',
+            labels={'hour': 'Hora del Día', 'number_of_transactions': 'Número de Transacciones'}
+        )
+        fig_hourly.update_layout(xaxis = dict(tickmode = 'linear', dtick = 1))
+        st.plotly_chart(fig_hourly, width='stretch')
 else:
     st.warning("No hay datos de afluencia para mostrar con los filtros seleccionados.")
 
@@ -299,3 +268,5 @@ with st.container():
 
     st.markdown('</div>', unsafe_allow_html=True) # Close sticker-container div
     st.markdown('</div>', unsafe_allow_html=True) # Close content-box div
+
+profiling.finish()
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+# Upper bound for the cached aggregates of the whole process
+MAX_BYTES = int(float(os.environ.get('DASHBOARD_AGG_CACHE_MB', 64)) * 1024 * 1024)
+
+
+def _canonical(value):
+    # Same selection -> same key: selections are sets, dates are ISO strings
+    if isinstance(value, (list, tuple, set, frozenset, pd.Index)):
+        return sorted((_canonical(v) for v in value), key=str)
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, pd.Timestamp) or hasattr(value, 'isoformat'):
+        return pd.Timestamp(value).isoformat()
+    if hasattr(value, 'item'):
+        return value.item()  # numpy scalar
+    return value
+
+
+def cache_key(*parts, **filters):
+    """Stable hash of the dataset version, the aggregate name and the filter state."""
+    payload = json.dumps([_canonical(list(parts)), _canonical(filters)], default=str, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_size(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class AggregateCache:
+    """Process-wide LRU of computed aggregates, bounded by their memory size.
+
+    Values are shared by every session that asks for the same key:
+    callers must not modify them in place.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, bytes)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = _size(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value  # larger than the whole cache, not kept
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, or compute() stored under it."""
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def shared_cache():
+    """The AggregateCache shared by every session of this server process."""
+    return AggregateCache()
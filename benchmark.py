@@ -0,0 +1,462 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+import pydeck as pdk
+import streamlit as st
+
+import charts
+from coffee_data import STORE_LOCATIONS, add_time_columns, attach_locations, hourly_traffic
+import synthetic
+from data_cache import CACHE_DIR, read_excel
+from downsample import RESOLUTION_NAMES, time_series
+from figure_cache import cached_figure, shared_figure_cache
+from filter_index import FilterIndex
+from flights import CAUSE_COLUMNS
+from flights_agg import aggregate_flights
+from geo import Deck, load_municipios, load_municipios_layer
+from sales_cube import SalesCube
+from schema import STATE_ABBREVIATIONS, normalize_sales
+from top_k import TopK
+
+SCALES = [1, 10, 100]
+BENCH_DIR = CACHE_DIR / 'benchmark'
+BASELINE_PATH = Path('benchmarks/baseline.json')
+# 1x = rows of SalidaFinal.xlsx / of the Maven coffee-shop workbook the
+# modified one comes from / of datos/lax_to_jfk.csv. Scales too big for one
+# sheet skip 'parse_excel'
+BASE_ROWS = {'sales': 16_302, 'coffee': 149_116, 'flights': 2_855}
+# Read by the dashboards as .parquet copies unless listed here; only the
+# workbook-backed kinds get an .xlsx for 'parse_excel'
+SOURCE_SUFFIX = {'flights': '.csv'}
+EXCEL_KINDS = {'sales', 'coffee'}
+MUNICIPIOS_GEOJSON = 'Yucatan.geojson'
+MUNICIPIOS_CSV = 'municipiosDatos.csv'
+# A stage regresses when it is TOLERANCE times slower than the baseline
+# and the difference is above timer noise
+TOLERANCE = 1.25
+MIN_SECONDS = 0.005
+
+
+class StageTimer:
+    """Collects the best wall time of each named stage over several runs."""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def __call__(self, name):
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        self.stages[name] = min(elapsed, self.stages.get(name, float('inf')))
+
+
+# --- synthetic data ---------------------------------------------------------
+def _dataset(kind, factor):
+    """Synthetic copy at `factor` x the 1x size, built once: the source the
+    benchmark reads (Parquet, CSV for flights) and, when it fits, an XLSX."""
+    rows = BASE_ROWS[kind] * factor
+    source = BENCH_DIR / f'{kind}-{factor}x{SOURCE_SUFFIX.get(kind, ".parquet")}'
+    if not source.exists():
+        synthetic.write(kind, rows, source)
+    xlsx = BENCH_DIR / f'{kind}-{factor}x.xlsx'
+    if kind in EXCEL_KINDS and rows <= synthetic.EXCEL_MAX_ROWS and not xlsx.exists():
+        synthetic.write(kind, rows, xlsx)
+    return source, (xlsx if xlsx.exists() else None), rows
+
+
+def _parse_excel(xlsx, timer, columns=None):
+    # Slow and stable: parsed on the first repetition only
+    if xlsx is not None and 'parse_excel' not in timer.stages:
+        with timer('parse_excel'):
+            read_excel(xlsx, columns=columns)
+
+
+def _cold_caches():
+    # Every Streamlit cache emptied: what follows times the first run of a
+    # server process (on-disk caches such as the GeoJSON levels are kept)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def _cached_figures(build, timer):
+    """Time build() (cached_figure calls) on an empty figure cache and again on a warm one."""
+    shared_figure_cache().clear()
+    with timer('figures'):
+        figures = build()
+    with timer('figures_cached'):
+        build()
+    return figures
+
+
+def _render(figures, timer, decks=()):
+    # What st.plotly_chart / st.pydeck_chart send to the browser
+    with timer('serialize'):
+        for fig in figures:
+            pio.to_json(fig, validate=False)
+        for deck in decks:
+            deck.to_json()
+
+
+# --- one function per dashboard, mirroring its script stage by stage ---------
+# The stages call the helpers the scripts call (charts, figure_cache, geo,
+# TopK...), so a regression in any of them shows up here
+def bench_dashboard(parquet, xlsx, timer):
+    """dashboard.py: projected load + cube roll-ups by region/year/category."""
+    columns = ['Region', 'Order Date', 'Category', 'Sub-Category', 'Sales', 'State', 'Profit', 'Quantity']
+    _parse_excel(xlsx, timer, columns=columns)
+    with timer('load'):
+        df = normalize_sales(pd.read_parquet(parquet, columns=columns))
+    with timer('index'):
+        cube = SalesCube(df)
+    with timer('aggregate'):
+        by_region = cube.query(['Region'], measures=['Sales']).set_index('Region')['Sales']
+        by_year = cube.query(['Year', 'Category'], measures=['Sales'])
+        by_sub = cube.query(['Year', 'Category', 'Sub-Category'], measures=['Sales'])
+
+    def build():
+        labels = {'Sales': 'Ventas', 'Year': 'Año', 'Category': 'Categoría', 'Sub-Category': 'Sub-Categoría'}
+        return [
+            cached_figure(charts.bar, by_region, x=by_region.index, y='Sales', title='Ventas Acumuladas por Región',
+                          labels={'Sales': 'Ventas', 'x': 'Región'}),
+            cached_figure(charts.line, by_year, x='Year', y='Sales', color='Category',
+                          title='Ventas Acumuladas por Año y Categoría', labels=labels),
+            cached_figure(charts.bar, by_year, x='Year', y='Sales', color='Category',
+                          title='Ventas Acumuladas por Año y Categoría (Barras)', labels=labels, barmode='stack'),
+            cached_figure(charts.bar, by_sub, x='Year', y='Sales', color='Sub-Category',
+                          title='Ventas Acumuladas por Año, Categoría y Sub-Categoría (Barras)', labels=labels,
+                          barmode='stack', facet_col='Category'),
+            cached_figure(charts.bar, by_sub, x='Category', y='Sales', color='Sub-Category',
+                          title='Ventas Acumuladas por Año, Categoría y Sub-Categoría (Barras)', labels=labels,
+                          barmode='stack', facet_col='Year'),
+        ]
+
+    _render(_cached_figures(build, timer), timer)
+    return len(df)
+
+
+def bench_ventas(parquet, xlsx, timer):
+    """dashboardVentas.py: cascading Region/State filter through the bitmap index."""
+    _parse_excel(xlsx, timer)
+    with timer('load'):
+        df = normalize_sales(pd.read_parquet(parquet))
+    with timer('index'):
+        index = FilterIndex(df)
+    with timer('filter'):
+        region = index.values('Region')[0]
+        state = index.values('State', {'Region': [region]})[0]
+        filtered = index.select({'Region': [region], 'State': [state]})
+    with timer('filter_isin'):
+        df[(df['Region'] == region) & (df['State'] == state)]
+    with timer('aggregate'):
+        by_region = df.groupby('Region', observed=True)['Sales'].sum()
+        category_counts = filtered['Category'].value_counts()
+        category_counts = category_counts[category_counts > 0]
+    with timer('figures'):
+        # The script draws these two with plotly.express directly
+        figures = [
+            px.bar(by_region, x=by_region.index, y='Sales', title='Ventas Acumuladas por Región',
+                   labels={'Sales': 'Ventas', 'x': 'Región'}),
+            px.pie(category_counts, values=category_counts.values, names=category_counts.index,
+                   title='Distribución de Categorías'),
+        ]
+    _render(figures, timer)
+    return len(df)
+
+
+def bench_ventas2025(parquet, xlsx, timer):
+    """dashboardVentas2025.py: one-region filter + top-5 products by sales/profit."""
+    from dashboardVentas2025 import plot_top_profitable_products, plot_top_selling_products
+
+    columns = ['Region', 'Product Name', 'Sales', 'Profit']
+    _parse_excel(xlsx, timer, columns=columns)
+    with timer('load'):
+        df = normalize_sales(pd.read_parquet(parquet, columns=columns))
+    with timer('index'):
+        top_k = TopK(df, 'Product Name', ['Sales', 'Profit'], partitions=('Region',))
+    filters = {'Region': [df['Region'].iloc[0]]}
+    with timer('aggregate'):
+        top_k.top(5, 'Sales', filters)
+        top_k.top(5, 'Profit', filters)
+    with timer('figures'):
+        # The script's own chart functions (each runs its top-5 query again)
+        figures = [plot_top_selling_products(top_k, filters), plot_top_profitable_products(top_k, filters)]
+    _render(figures, timer)
+    return len(df)
+
+
+def bench_ventas2026(parquet, xlsx, timer):
+    """dashboardVentas2026.py: region/category/date filters, KPIs and four charts."""
+    _parse_excel(xlsx, timer)
+    with timer('load'):
+        df = normalize_sales(pd.read_parquet(parquet))
+    with timer('index'):
+        cube = SalesCube(df)
+        index = FilterIndex(df)
+        top_k = TopK(df, 'Product Name', ['Sales', 'Profit'], ('Region', 'Category'), 'Order Date')
+    regions = list(df['Region'].unique()[:2])
+    categories = list(df['Category'].unique()[:2])
+    start_date, end_date = df['Order Date'].quantile([0.25, 0.75])
+    filters = dict(regions=regions, categories=categories, start_date=start_date, end_date=end_date)
+    with timer('filter'):
+        index.mask({'Region': regions, 'Category': categories}, start_date=start_date, end_date=end_date).sum()
+    with timer('filter_isin'):
+        df[df['Region'].isin(regions) & df['Category'].isin(categories)
+           & (df['Order Date'] >= start_date) & (df['Order Date'] <= end_date)]
+    with timer('aggregate'):
+        cube.totals(**filters)
+        over_time = cube.query(['Order Date'], measures=['Sales', 'Profit'], **filters)
+        by_region = cube.query(['Region'], measures=['Sales'], **filters)
+        by_state = cube.query(['State'], measures=['Sales'], **filters)
+        by_state['State_Code'] = by_state['State'].map(STATE_ABBREVIATIONS)
+        by_state['Log_Sales'] = np.log1p(by_state['Sales'])
+        top_products = top_k.top(10, 'Sales', {'Region': regions, 'Category': categories},
+                                 start_date, end_date).reset_index()
+
+    def build():
+        series, rule = time_series(over_time, 'Order Date', ['Sales', 'Profit'], start_date, end_date)
+        return [
+            cached_figure(charts.line, series, x='Order Date', y='value', color='variable',
+                          title=f'Ventas y Ganancias por {RESOLUTION_NAMES[rule]}',
+                          labels={'value': 'Monto', 'Order Date': 'Fecha del Pedido'}),
+            cached_figure(charts.bar, by_region, x='Region', y='Sales', title='Ventas Totales por Región',
+                          labels={'Sales': 'Ventas Totales', 'Region': 'Región'}, color='Region'),
+            cached_figure(charts.bar, top_products, x='Sales', y='Product Name', orientation='h',
+                          title='Top 10 Productos Más Vendidos',
+                          labels={'Sales': 'Ventas Totales', 'Product Name': 'Nombre del Producto'}),
+            cached_figure(px.choropleth, by_state, locations='State_Code', locationmode='USA-states',
+                          color='Log_Sales', scope='usa', color_continuous_scale='Plasma',
+                          title='Ventas Totales por Estado en USA (Escala Logarítmica)',
+                          labels={'Log_Sales': 'Log de Ventas Totales', 'State': 'Estado'}, hover_name='State',
+                          hover_data={'Sales': ':.2f', 'Log_Sales': False}, layout=dict(geo_scope='usa')),
+        ]
+
+    _render(_cached_figures(build, timer), timer)
+    return len(df)
+
+
+def bench_cafeteria(parquet, xlsx, timer):
+    """CafeteriaenYucatan.py: location join, store/product filters, map and charts."""
+    _parse_excel(xlsx, timer)
+    with timer('load'):
+        df = pd.read_parquet(parquet).rename(columns={'store_location': 'store_name'})
+    with timer('prepare'):
+        df = add_time_columns(df)
+        df = attach_locations(df, STORE_LOCATIONS.set_index('state store location'))
+        df = df.dropna(subset=['latitude', 'longitude'])
+    with timer('index'):
+        top_k = TopK(df, 'product_detail', ['transaction_qty'], partitions=('store_name', 'product_type'))
+    _cold_caches()
+    with timer('layer'):
+        geojson_layer = load_municipios_layer(MUNICIPIOS_GEOJSON, MUNICIPIOS_CSV, zoom=9, fill_alpha=100,
+                                              line_alpha=100, opacity=0.5)
+    stores = list(df['store_name'].unique()[:2])
+    product_types = list(df['product_type'].unique())
+    with timer('filter'):
+        filtered = df[df['store_name'].isin(stores) & df['product_type'].isin(product_types)]
+    with timer('aggregate'):
+        points = filtered[['store_name', 'state store location', 'latitude', 'longitude']].drop_duplicates()
+        top_products = top_k.top(10, 'transaction_qty',
+                                 {'store_name': stores, 'product_type': product_types}).reset_index()
+        top_products = top_products.rename(columns={'transaction_qty': 'total_quantity_sold'})
+        hourly = hourly_traffic(filtered)
+    with timer('figures'):
+        fig_products = charts.bar(top_products, x='product_detail', y='total_quantity_sold',
+                                  title='Top 10 Productos más vendidos por cantidad',
+                                  labels={'product_detail': 'Producto', 'total_quantity_sold': 'Cantidad Total Vendida'})
+        fig_products.update_layout(xaxis_title_standoff=25)
+        fig_products.update_xaxes(tickangle=45)
+        fig_hourly = charts.line(hourly, x='hour', y='number_of_transactions',
+                                 title='Número de Transacciones por Hora',
+                                 labels={'hour': 'Hora del Día', 'number_of_transactions': 'Número de Transacciones'})
+        fig_hourly.update_layout(xaxis=dict(tickmode='linear', dtick=1))
+        deck = Deck(
+            map_style='mapbox://styles/mapbox/light-v9',
+            initial_view_state=pdk.ViewState(latitude=points['latitude'].mean(),
+                                             longitude=points['longitude'].mean(), zoom=9, pitch=45),
+            layers=[geojson_layer, charts.point_layer(points, get_color='[200, 30, 0, 160]', get_radius=500,
+                                                      radius_units='meters', pickable=True)],
+            tooltip={'text': 'Store: {store_name}\nLocation: {state store location}'},
+        )
+    _render([fig_products, fig_hourly], timer, decks=[deck])
+    return len(df)
+
+
+def bench_mapas(source, xlsx, timer):
+    """mapas.py: municipality table and the simplified, pre-serialized choropleth layer."""
+    _cold_caches()
+    with timer('load'):
+        municipios = load_municipios(MUNICIPIOS_CSV)
+    with timer('layer'):
+        layer = load_municipios_layer(MUNICIPIOS_GEOJSON, MUNICIPIOS_CSV, zoom=7, fill_alpha=200,
+                                      line_alpha=200, opacity=0.8)
+    with timer('layer_cached'):
+        load_municipios_layer(MUNICIPIOS_GEOJSON, MUNICIPIOS_CSV, zoom=7, fill_alpha=200, line_alpha=200,
+                              opacity=0.8)
+    with timer('figures'):
+        deck = Deck(layers=[layer], initial_view_state=pdk.ViewState(latitude=20.8, longitude=-89.0, zoom=7, pitch=0),
+                    tooltip={'text': 'Municipio: {NOMGEO}\nRandomNumbers: {RandomNumbers}'})
+    _render([], timer, decks=[deck])
+    return len(municipios)
+
+
+def bench_vuelos(csv, xlsx, timer):
+    """dashboardVuelos.py: one streaming pass over the flights CSV, roll-ups and five charts."""
+    with timer('load'):
+        aggregates = aggregate_flights(csv)
+    years = aggregates.years()
+    filters = dict(airlines=aggregates.airlines(), years=(int(years[0]), int(years[-1])))
+    with timer('aggregate'):
+        totals = aggregates.totals(**filters)
+        by_airline = aggregates.query('Reporting_Airline', **filters)
+        by_month = aggregates.query('Month', **filters)
+        by_day = aggregates.query('DayOfWeek', **filters)
+        by_hour = aggregates.query('DepHour', **filters)
+        causes = totals[CAUSE_COLUMNS].rename_axis('Causa').reset_index(name='Minutos')
+    with timer('figures'):
+        # The script draws these with plotly.express directly
+        labels = {'mean_delay': 'Retraso medio (min)', 'p50': 'Mediana (min)', 'p90': 'Percentil 90 (min)',
+                  'flights': 'Vuelos'}
+        by_day['Día'] = by_day['DayOfWeek'].map({1: 'Lun', 2: 'Mar', 3: 'Mié', 4: 'Jue', 5: 'Vie', 6: 'Sáb',
+                                                 7: 'Dom'})
+        fig_month = px.line(by_month, x='Month', y=['mean_delay', 'p90'], markers=True, title='Retraso por Mes',
+                            labels={**labels, 'Month': 'Mes', 'value': 'Minutos', 'variable': 'Estadístico'})
+        fig_month.update_layout(xaxis=dict(tickmode='linear', dtick=1))
+        fig_hour = px.bar(by_hour, x='DepHour', y='mean_delay', hover_data=['p50', 'p90', 'flights'],
+                          title='Retraso Medio de Llegada por Hora de Salida',
+                          labels={**labels, 'DepHour': 'Hora programada'})
+        fig_hour.update_layout(xaxis=dict(tickmode='linear', dtick=1))
+        figures = [
+            px.bar(by_airline, x='Reporting_Airline', y=['mean_delay', 'p50', 'p90'], barmode='group',
+                   hover_data=['flights'], title='Retraso de Llegada por Aerolínea (media, mediana y P90)',
+                   labels={**labels, 'Reporting_Airline': 'Aerolínea', 'value': 'Minutos',
+                           'variable': 'Estadístico'}),
+            fig_month,
+            px.bar(by_day, x='Día', y='mean_delay', hover_data=['p50', 'p90', 'flights'],
+                   title='Retraso Medio por Día de la Semana', labels=labels),
+            fig_hour,
+            px.pie(causes, values='Minutos', names='Causa', title='Minutos de Retraso por Causa'),
+        ]
+    _render(figures, timer)
+    return int(totals['flights'])
+
+
+# dashboard -> (benchmark, synthetic dataset; None = the bundled files, which do not scale)
+BENCHMARKS = {
+    'dashboard': (bench_dashboard, 'sales'),
+    'dashboardVentas': (bench_ventas, 'sales'),
+    'dashboardVentas2025': (bench_ventas2025, 'sales'),
+    'dashboardVentas2026': (bench_ventas2026, 'sales'),
+    'CafeteriaenYucatan': (bench_cafeteria, 'coffee'),
+    'mapas': (bench_mapas, None),
+    'dashboardVuelos': (bench_vuelos, 'flights'),
+}
+
+
+def run(dashboards=None, scales=SCALES, repeat=3):
+    """Time every stage of each dashboard at each scale; returns the results document."""
+    results = {}
+    for dashboard in dashboards or BENCHMARKS:
+        bench, kind = BENCHMARKS[dashboard]
+        # The bundled files are the same at every scale: timed once, as 1x
+        for factor in (scales if kind else [1]):
+            source, xlsx, rows = _dataset(kind, factor) if kind else (None, None, None)
+            timer = StageTimer()
+            for _ in range(repeat):
+                measured = bench(source, xlsx, timer)
+            rows = rows or measured
+            results.setdefault(dashboard, {})[f'{factor}x'] = {'rows': rows, 'stages': timer.stages}
+            print(f"{dashboard} {factor}x ({rows:,} filas): "
+                  + ', '.join(f'{stage} {seconds * 1000:.1f} ms' for stage, seconds in timer.stages.items()))
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def run_apptest(scripts=None):
+    """Wall time of a full headless run of each dashboard script (bundled data, 1x)."""
+    from streamlit.testing.v1 import AppTest
+
+    timings = {}
+    for script in scripts or BENCHMARKS:
+        path = f'{script}.py'
+        start = time.perf_counter()
+        at = AppTest.from_file(str(Path(path).resolve()), default_timeout=600).run()
+        timings[script] = {'seconds': time.perf_counter() - start, 'errors': len(at.exception) + len(at.error)}
+        print(f"{path}: {timings[script]['seconds']:.2f} s, {timings[script]['errors']} errores")
+    return timings
+
+
+def _flatten(document):
+    return {(dashboard, scale, stage): seconds
+            for dashboard, scales in document['results'].items()
+            for scale, entry in scales.items()
+            for stage, seconds in entry['stages'].items()}
+
+
+def compare(results, baseline, tolerance=TOLERANCE, min_seconds=MIN_SECONDS):
+    """Stages slower than the baseline: [(dashboard, scale, stage, baseline s, current s)]."""
+    previous = _flatten(baseline)
+    regressions = []
+    for key, seconds in _flatten(results).items():
+        before = previous.get(key)
+        if before is not None and seconds > before * tolerance and seconds - before > min_seconds:
+            regressions.append((*key, before, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tiempos por etapa de los dashboards con datos sintéticos.')
+    parser.add_argument('dashboards', nargs='*', help=f"por defecto todos: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', type=Path, help='JSON de resultados (por defecto en .cache/benchmark)')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='guarda estos resultados como línea base')
+    parser.add_argument('--apptest', action='store_true', help='además, ejecuta cada script completo con AppTest')
+    args = parser.parse_args(argv)
+    unknown = set(args.dashboards) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"dashboards desconocidos: {', '.join(sorted(unknown))}")
+
+    document = run(args.dashboards or None, args.scales, args.repeat)
+    if args.apptest:
+        document['apptest'] = run_apptest(args.dashboards or None)
+
+    output = args.output or BENCH_DIR / f"results-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    print(f"Resultados: {output}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(document, indent=2))
+        print(f"Línea base guardada en {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"Sin línea base en {args.baseline}: no se comparan regresiones "
+              f"(créala con: python benchmark.py --scales 1 --save-baseline)")
+        return 0
+    regressions = compare(document, json.loads(args.baseline.read_text()))
+    for dashboard, scale, stage, before, seconds in regressions:
+        print(f"REGRESIÓN {dashboard} {scale} {stage}: {before * 1000:.1f} ms -> {seconds * 1000:.1f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
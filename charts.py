@@ -0,0 +1,109 @@
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import pydeck as pdk
+
+# Line/scatter charts with more points than this (all traces together) are
+# drawn with WebGL (scattergl) instead of one SVG element per point
+WEBGL_POINTS = int(os.environ.get('DASHBOARD_WEBGL_POINTS', 5_000))
+# Point maps with more points than this are binned into a grid on the server:
+# the browser gets at most MAP_BINS x MAP_BINS cells instead of every point
+MAP_POINTS = int(os.environ.get('DASHBOARD_MAP_POINTS', 50_000))
+MAP_BINS = 200
+
+# Shared look of the dashboards' Plotly charts
+COLORS = px.colors.qualitative.Plotly
+LAYOUT = dict(
+    font=dict(family='Arial, sans-serif'),
+    title=dict(x=0, xanchor='left'),
+    hoverlabel=dict(namelength=-1),
+)
+
+
+def points(data, y=None):
+    """Number of markers a px chart of `data` draws (rows times y columns)."""
+    columns = len(y) if isinstance(y, (list, tuple)) else 1
+    return len(data) * columns
+
+
+def render_mode(data, y=None, threshold=WEBGL_POINTS):
+    """'webgl' above `threshold` points, else 'svg' (sharper and supports every trace option)."""
+    return 'webgl' if points(data, y) > threshold else 'svg'
+
+
+def style(fig, **layout):
+    """Apply the shared layout (plus `layout` overrides) to a figure."""
+    fig.update_layout(**{**LAYOUT, **layout})
+    return fig
+
+
+def line(data, **params):
+    """px.line with the shared style, drawn with WebGL when it has many points."""
+    params.setdefault('render_mode', render_mode(data, params.get('y')))
+    params.setdefault('color_discrete_sequence', COLORS)
+    return style(px.line(data, **params))
+
+
+def scatter(data, **params):
+    """px.scatter with the shared style, drawn with WebGL when it has many points."""
+    params.setdefault('render_mode', render_mode(data, params.get('y')))
+    params.setdefault('color_discrete_sequence', COLORS)
+    return style(px.scatter(data, **params))
+
+
+def bar(data, **params):
+    """px.bar with the shared style (bars are aggregates: always SVG)."""
+    params.setdefault('color_discrete_sequence', COLORS)
+    return style(px.bar(data, **params))
+
+
+def bin_points(data, lat='latitude', lon='longitude', bins=MAP_BINS):
+    """Point counts on a bins x bins grid over the data extent: columns lon, lat (cell centres), count."""
+    x = data[lon].to_numpy(dtype='float64')
+    y = data[lat].to_numpy(dtype='float64')
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    ix, iy = np.nonzero(counts)
+    # 5 decimals (~1 m) are plenty for a cell centre and keep the JSON short
+    return pd.DataFrame({
+        'lon': ((x_edges[ix] + x_edges[ix + 1]) / 2).round(5),
+        'lat': ((y_edges[iy] + y_edges[iy + 1]) / 2).round(5),
+        'count': counts[ix, iy].astype('int64'),
+    })
+
+
+def point_layer(data, lat='latitude', lon='longitude', max_points=MAP_POINTS, **params):
+    """deck.gl layer for a point map.
+
+    Up to `max_points` every point is a ScatterplotLayer marker (`params`
+    are passed on, so radius, colour and picking work as with pdk.Layer).
+    Above it the points are binned with bin_points() and drawn as a
+    ScreenGridLayer weighted by count: the payload stays bounded and the
+    map keeps panning smoothly with hundreds of thousands of points.
+    """
+    data = data.dropna(subset=[lat, lon])
+    if len(data) <= max_points:
+        params = {'get_position': f'[{lon}, {lat}]', 'get_color': '[200, 30, 0, 160]', 'get_radius': 3,
+                  'radius_units': 'pixels', **params}
+        return pdk.Layer('ScatterplotLayer', data, **params)
+    return pdk.Layer('ScreenGridLayer', bin_points(data, lat, lon), get_position='[lon, lat]', get_weight='count',
+                     cell_size_pixels=6, opacity=0.8, pickable=False)
+
+
+def view_for(data, lat='latitude', lon='longitude', pitch=0):
+    """pdk.ViewState centred on the points, zoomed to fit their extent."""
+    data = data.dropna(subset=[lat, lon])
+    if data.empty:
+        return pdk.ViewState(latitude=0, longitude=0, zoom=1, pitch=pitch)
+    span = max(data[lon].max() - data[lon].min(), data[lat].max() - data[lat].min(), 1e-3)
+    zoom = min(max(math.log2(360 / span) - 0.5, 1), 15)
+    return pdk.ViewState(latitude=float(data[lat].mean()), longitude=float(data[lon].mean()), zoom=zoom,
+                         pitch=pitch)
+
+
+def point_map(data, lat='latitude', lon='longitude', max_points=MAP_POINTS, **params):
+    """pdk.Deck drawing `data` with point_layer(); a drop-in for st.map(data) via st.pydeck_chart."""
+    return pdk.Deck(layers=[point_layer(data, lat, lon, max_points, **params)],
+                    initial_view_state=view_for(data, lat, lon))
@@ -0,0 +1,319 @@
+import argparse
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+import xlsx_stream
+from data_cache import write_parquet
+
+# Rows cleaned per task of the process pool
+CHUNK_ROWS = 100_000
+# Largest sheet Excel can hold (one header row); bigger results are written to Parquet only
+EXCEL_MAX_ROWS = 1_048_575
+
+# Strings read as True/False by the 'coerce' step (after strip + lower)
+TRUE_VALUES = {'true', '1', 'si', 'sí', 'yes', 'x', 'verdadero'}
+FALSE_VALUES = {'false', '0', 'no', 'falso'}
+
+# name -> (function(df, **options) -> df, merge); merge steps run again on the joined chunks
+STEPS = {}
+
+
+def step(name, merge=False):
+    """Register a cleaning step usable by name in a pipeline spec.
+
+    Steps must be defined at import time of a module the workers import
+    (the pool uses spawn), like the ones below.
+    """
+    def decorator(func):
+        STEPS[name] = (func, merge)
+        return func
+    return decorator
+
+
+def _present(df, columns):
+    # Raw exports do not all have the same columns: missing ones are skipped
+    return [c for c in columns if c in df.columns]
+
+
+def _text(series, method):
+    # str method on the text cells only; numbers and dates in mixed columns are kept
+    result = getattr(series.str, method)()
+    result = result.where(result.notna(), series)
+    return result.mask(result.eq(''))
+
+
+@step('rename')
+def rename(df, columns):
+    return df.rename(columns=columns)
+
+
+@step('drop')
+def drop(df, columns):
+    return df.drop(columns=_present(df, columns))
+
+
+@step('strip')
+def strip(df, columns):
+    """Trim surrounding spaces; empty strings become missing."""
+    df = df.copy()
+    for col in _present(df, columns):
+        df[col] = _text(df[col], 'strip')
+    return df
+
+
+@step('upper')
+def upper(df, columns):
+    df = df.copy()
+    for col in _present(df, columns):
+        df[col] = _text(_text(df[col], 'strip'), 'upper')
+    return df
+
+
+@step('replace')
+def replace(df, values):
+    """{column: {old: new}} for known misspellings."""
+    return df.replace({col: mapping for col, mapping in values.items() if col in df.columns})
+
+
+def _coerce(series, kind):
+    if kind == 'int':
+        return pd.to_numeric(series, errors='coerce').round().astype('Int64')
+    if kind == 'float':
+        return pd.to_numeric(series, errors='coerce').astype('float64')
+    if kind == 'str':
+        return _text(series.astype('string'), 'strip')
+    if kind == 'category':
+        return series.astype('category')
+    if kind == 'datetime':
+        return pd.to_datetime(series, errors='coerce')
+    if kind == 'bool':
+        text = series.astype('string').str.strip().str.lower()
+        return text.map(lambda v: True if v in TRUE_VALUES else False if v in FALSE_VALUES else pd.NA,
+                        na_action='ignore').astype('boolean')
+    raise ValueError(f"Tipo no soportado: '{kind}'")
+
+
+@step('coerce')
+def coerce(df, dtypes):
+    """{column: 'int' | 'float' | 'str' | 'bool' | 'category' | 'datetime'}; invalid values become missing."""
+    df = df.copy()
+    for col, kind in dtypes.items():
+        if col in df.columns:
+            df[col] = _coerce(df[col], kind)
+    return df
+
+
+@step('parse_dates')
+def parse_dates(df, columns, dayfirst=False, format=None):
+    df = df.copy()
+    for col in _present(df, columns):
+        df[col] = pd.to_datetime(df[col], errors='coerce', dayfirst=dayfirst, format=format)
+    return df
+
+
+def _times_of_day(values):
+    # 'HH:MM:SS' text (or missing) for an array of raw values
+    series = pd.Series(values, dtype=object)
+    numeric = pd.to_numeric(series, errors='coerce')
+    text = series.astype('string').str.strip()
+    text = text.where(~text.str.fullmatch(r'\d{1,2}:\d{2}', na=False), text + ':00')
+    delta = pd.to_timedelta(text.where(numeric.isna()), errors='coerce')
+    seconds = delta.fillna(pd.to_timedelta(numeric, unit='D')).dt.round('s').dt.total_seconds()
+    valid = (seconds.notna() & (seconds >= 0) & (seconds < 86_400)).to_numpy()
+    out = np.full(len(series), None, dtype=object)
+    out[valid] = [f'{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}'
+                  for s in seconds[valid].astype('int64').tolist()]
+    return out
+
+
+@step('parse_times')
+def parse_times(df, columns):
+    """Times of day ('8:14', '08:14:36', time cells, day fractions) as 'HH:MM:SS' text.
+
+    Each distinct value is converted once, then rows take theirs by code.
+    """
+    df = df.copy()
+    for col in _present(df, columns):
+        codes, uniques = pd.factorize(df[col])
+        converted = np.append(_times_of_day(uniques), None)  # code -1 (missing) -> None
+        df[col] = pd.array(converted[codes], dtype='string')
+    return df
+
+
+@step('fill')
+def fill(df, values):
+    """{column: value} for missing cells."""
+    return df.fillna({col: value for col, value in values.items() if col in df.columns})
+
+
+@step('dropna')
+def dropna(df, subset):
+    return df.dropna(subset=_present(df, subset))
+
+
+@step('dedup', merge=True)
+def dedup(df, subset=None, keep='first'):
+    subset = _present(df, subset) if subset is not None else None
+    return df.drop_duplicates(subset=subset, keep=keep)
+
+
+@step('visit_stay')
+def visit_stay(df):
+    """Exit timestamp and length of stay of the coworking visit log.
+
+    horaSalida was captured on a 12 h clock: an exit that falls before the
+    entry is moved 12 h later (days = -1 flags those rows).
+    """
+    df = df.copy()
+    entrada = df['fechaEntrada']
+    if 'fechaSalida' not in df.columns:
+        df['fechaSalida'] = pd.NaT
+    df['fechaSalida'] = pd.to_datetime(df['fechaSalida']).fillna(entrada.dt.normalize())
+    salida = df['fechaSalida'] + pd.to_timedelta(df['horaSalida'], errors='coerce')
+    df['days'] = (salida - entrada).dt.days.astype('Int64')
+    df['ts_salida'] = salida.where(df['days'] >= 0, salida + pd.Timedelta(hours=12))
+    df['diff2'] = (df['ts_salida'] - entrada) / pd.Timedelta(days=1)
+    df['estancia_minutes'] = (df['diff2'] * 24 * 60).round(2)
+    return df
+
+
+# Declarative pipelines: python cleaning.py <name> <raw exports...>
+PIPELINES = {
+    # Coworking entry/exit log -> datos/resultadoLimpieza.xlsx
+    'visitas': {
+        'output': 'datos/resultadoLimpieza',
+        'steps': [
+            {'step': 'drop', 'columns': ['Unnamed: 0']},
+            {'step': 'strip', 'columns': ['ocupacion', 'motivo']},
+            {'step': 'parse_dates', 'columns': ['fechaEntrada', 'fechaSalida']},
+            {'step': 'parse_times', 'columns': ['horaEntrada', 'horaSalida']},
+            {'step': 'dropna', 'subset': ['fechaEntrada', 'horaSalida']},
+            {'step': 'dedup'},
+            {'step': 'visit_stay'},
+        ],
+    },
+    # Coffee-shop transactions, with the location spellings CafeteriaenYucatan.py expects
+    'cafeteria': {
+        'output': 'datos/cafeteriaLimpia',
+        'steps': [
+            {'step': 'upper', 'columns': ['state store location']},
+            {'step': 'strip', 'columns': ['store_location', 'product_category', 'product_type', 'product_detail']},
+            {'step': 'parse_dates', 'columns': ['transaction_date']},
+            {'step': 'parse_times', 'columns': ['transaction_time']},
+            {'step': 'coerce', 'dtypes': {'transaction_id': 'int', 'transaction_qty': 'int', 'store_id': 'int',
+                                          'product_id': 'int', 'unit_price': 'float'}},
+            {'step': 'dropna', 'subset': ['transaction_id', 'transaction_date', 'state store location']},
+            {'step': 'dedup', 'subset': ['transaction_id']},
+        ],
+    },
+}
+
+
+def clean_chunk(steps, df):
+    """Apply the steps of a pipeline spec to one chunk (runs in the pool workers)."""
+    for spec in steps:
+        options = {k: v for k, v in spec.items() if k != 'step'}
+        func, _ = STEPS[spec['step']]
+        df = func(df, **options)
+    return df
+
+
+def _merge_steps(steps):
+    return [spec for spec in steps if STEPS[spec['step']][1]]
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Yield a raw export (.csv, .parquet, .xlsx or .xls) in chunks of at most `chunk_rows` rows."""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.csv':
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+    elif suffix == '.parquet':
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    elif suffix in ('.xlsx', '.xlsm'):
+        yield from xlsx_stream.iter_batches(path, batch_rows=chunk_rows)
+    elif suffix == '.xls':
+        df = pd.read_excel(path)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+    else:
+        raise ValueError(f"Formato no soportado: '{suffix}'")
+
+
+def run(name, inputs, output=None, max_workers=1, chunk_rows=CHUNK_ROWS):
+    """Clean every input file with pipeline `name`; write <output>.parquet and <output>.xlsx.
+
+    Row-order is kept; 'merge' steps such as dedup run again on the joined
+    result. Returns a summary dict.
+
+    With max_workers > 1 (None = one per CPU, the CLI default) chunks are
+    cleaned in a spawn process pool with at most two pending chunks per
+    worker. Spawn re-imports the caller's __main__ in every worker, so the
+    calling script needs an `if __name__ == '__main__':` guard; from a
+    Streamlit page or stdin keep the default single worker.
+    """
+    pipeline = PIPELINES[name]
+    steps = pipeline['steps']
+    output = Path(output or pipeline['output'])
+    start = time.perf_counter()
+    rows_in = 0
+    chunks = (chunk for path in inputs for chunk in read_chunks(path, chunk_rows))
+    workers = max_workers or os.cpu_count() or 1
+    cleaned = []
+    if workers == 1:
+        for chunk in chunks:
+            rows_in += len(chunk)
+            cleaned.append(clean_chunk(steps, chunk))
+    else:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            pending = deque()
+            for chunk in chunks:
+                rows_in += len(chunk)
+                pending.append(pool.submit(clean_chunk, steps, chunk))
+                if len(pending) >= 2 * workers:
+                    cleaned.append(pending.popleft().result())
+            cleaned.extend(future.result() for future in pending)
+    result = pd.concat(cleaned, ignore_index=True) if cleaned else pd.DataFrame()
+    result = clean_chunk(_merge_steps(steps), result).reset_index(drop=True)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    written = [output.with_suffix('.parquet')]
+    write_parquet(result, written[0])
+    if len(result) <= EXCEL_MAX_ROWS:
+        xlsx = output.with_suffix('.xlsx')
+        tmp = xlsx.with_name(xlsx.name + '.tmp')
+        result.to_excel(tmp, index=False, engine='openpyxl')
+        os.replace(tmp, xlsx)
+        written.append(xlsx)
+    return {
+        'pipeline': name,
+        'rows_in': rows_in,
+        'rows_out': len(result),
+        'chunks': len(cleaned),
+        'seconds': round(time.perf_counter() - start, 3),
+        'outputs': [str(p) for p in written],
+    }
+
+
+if __name__ == '__main__':
+    # python cleaning.py visitas exportes/2019-*.xlsx
+    parser = argparse.ArgumentParser(description='Limpia exportes crudos y escribe Parquet + XLSX.')
+    parser.add_argument('pipeline', choices=list(PIPELINES))
+    parser.add_argument('inputs', nargs='+', type=Path)
+    parser.add_argument('--output', type=Path, help='ruta sin extensión (por omisión la del pipeline)')
+    parser.add_argument('--workers', type=int, default=None, help='procesos (por omisión uno por CPU)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+    summary = run(args.pipeline, args.inputs, output=args.output, max_workers=args.workers,
+                  chunk_rows=args.chunk_rows)
+    print(f"{summary['rows_in']:,} filas -> {summary['rows_out']:,} en {summary['chunks']} bloques, "
+          f"{summary['seconds']:.2f} s: {', '.join(summary['outputs'])}")
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_cache import file_signature, load_excel
+from geo import load_geojson
+from top_k import TopK
+
+# Approximate coordinates for the store locations in Yucatán, Mexico
+STORE_LOCATIONS = pd.DataFrame({
+    'state store location': ['MOTUL', 'TICUL', 'MERIDA'],
+    'latitude': [21.1667, 20.5833, 20.9670],
+    'longitude': [-89.2667, -89.5333, -89.6247],
+})
+
+
+def build_location_table(geojson, locations=STORE_LOCATIONS):
+    """Location dimension: location -> latitude, longitude, municipality, CVEGEO.
+
+    The municipality and its INEGI key come from the GeoJSON features whose
+    NOMGEO matches the location name.
+    """
+    municipios = pd.DataFrame([feature['properties'] for feature in geojson['features']])
+    municipios = (municipios[['NOMGEO', 'CVEGEO']]
+                  .drop_duplicates('NOMGEO')
+                  .rename(columns={'NOMGEO': 'municipality'}))
+    table = locations.merge(municipios, how='left',
+                            left_on='state store location', right_on='municipality')
+    return table.set_index('state store location')
+
+
+def attach_locations(df, locations):
+    """Join the location dimension onto the transactions through categorical codes.
+
+    The upper-casing/stripping and the lookup run once per distinct location,
+    then every row takes its values by integer code (-1 = unknown -> NaN).
+    """
+    raw = df['state store location'].astype('category')
+    cleaned = raw.cat.categories.str.upper().str.strip()
+    # Raw spellings that clean to the same key share one category
+    keys = pd.CategoricalDtype(pd.unique(cleaned))
+    codes = keys.categories.get_indexer(cleaned)[raw.cat.codes.to_numpy()]
+    codes[raw.cat.codes.to_numpy() == -1] = -1
+    out = df.copy()
+    out['state store location'] = pd.Categorical.from_codes(codes, dtype=keys)
+
+    # One row per category, then a positional take by code (-1 has no row -> NaN)
+    joined = locations.reindex(keys.categories).reset_index(drop=True).reindex(codes)
+    for col in locations.columns:
+        out[col] = joined[col].to_numpy()
+    return out
+
+
+def add_time_columns(df):
+    """Parse 'transaction_time' once into compact hour (Int8) and
+    minute_of_day (Int16) columns.
+
+    Accepts 'HH:MM:SS' strings as well as the datetime.time values openpyxl
+    returns for time-formatted cells. Unparsable times become <NA>.
+    """
+    # Parse each distinct time once (at most 86400 of them), then expand by code
+    times = df['transaction_time'].astype('string').astype('category')
+    parsed = pd.to_timedelta(times.cat.categories, errors='coerce')
+    minutes = pd.array(parsed.total_seconds() // 60, dtype='Int16')
+    codes = times.cat.codes.to_numpy()
+    out = df.copy()
+    out['minute_of_day'] = pd.array(minutes.take(codes, allow_fill=True), dtype='Int16')
+    out['hour'] = (out['minute_of_day'] // 60).astype('Int8')
+    return out
+
+
+def hourly_traffic(df):
+    """Transactions per hour of day from the precomputed 'hour' column."""
+    hours = df['hour'].dropna().to_numpy(dtype=np.int64)
+    counts = np.bincount(hours, minlength=24)
+    present = np.flatnonzero(counts)
+    return pd.DataFrame({'hour': present, 'number_of_transactions': counts[present]})
+
+
+@st.cache_data(show_spinner=False)
+def _load_coffee_sales(file_path, geojson_path, signature):
+    df = load_excel(file_path)
+    # Ensure 'store_name' column exists
+    if 'store_location' in df.columns and 'store_name' not in df.columns:
+        df = df.rename(columns={'store_location': 'store_name'})
+    if 'transaction_time' in df.columns:
+        df = add_time_columns(df)
+    if 'state store location' not in df.columns:
+        return df.iloc[0:0]
+    locations = build_location_table(load_geojson(geojson_path))
+    df = attach_locations(df, locations)
+    # Drop rows where latitude or longitude could not be determined
+    return df.dropna(subset=['latitude', 'longitude'])
+
+
+def load_coffee_sales(file_path, geojson_path='Yucatan.geojson'):
+    """Coffee-shop transactions with store coordinates, municipality and CVEGEO."""
+    return _load_coffee_sales(file_path, geojson_path, file_signature(file_path))
+
+
+@st.cache_resource(show_spinner=False)
+def _load_top_products(file_path, geojson_path, signature):
+    df = _load_coffee_sales(file_path, geojson_path, signature)
+    return TopK(df, 'product_detail', ['transaction_qty'], partitions=('store_name', 'product_type'))
+
+
+def load_top_products(file_path, geojson_path='Yucatan.geojson'):
+    """TopK of quantity sold per product, by store and product type (shared across sessions)."""
+    return _load_top_products(file_path, geojson_path, file_signature(file_path))
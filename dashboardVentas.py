@@ -1,10 +1,22 @@
-import pandas as pd
 import streamlit as st
 import plotly.express as px
 
+import profiling
+from registry import get_dataset, warm_up
+from filter_index import load_filter_index
+from paged_table import paged_dataframe
+
+# Precarga en segundo plano de todos los datos del servidor (una vez por proceso)
+warm_up()
+# Tiempos por etapa de esta ejecución (panel opcional en la barra lateral y log)
+profiling.start('dashboardVentas')
+
 # Lee el archivo Excel
 try:
-  df = pd.read_excel('SalidaFinal.xlsx')
+  with profiling.stage('load') as etapa:
+    df = get_dataset('ventas')
+    filter_index = load_filter_index('SalidaFinal.xlsx')
+    etapa.rows_out = len(df)
   print(df.head())  # Muestra las primeras filas del DataFrame
 except FileNotFoundError:
   print("Error: El archivo 'SalidaFinal.xlsx' no se encuentra.")
@@ -16,16 +28,18 @@ except Exception as e:
 # Lee el archivo Excel
 try:
     # Agrupa por región y suma las ventas
-    sales_by_region = df.groupby('Region')['Sales'].sum()
-
-    # Crea la gráfica de barras con Plotly Express
-    fig = px.bar(sales_by_region, 
-                 x=sales_by_region.index, 
-                 y='Sales', 
-                 title='Ventas Acumuladas por Región',
-                 labels={'Sales': 'Ventas', 'x': 'Región'})
+    with profiling.stage('aggregate', rows_in=len(df)):
+        sales_by_region = df.groupby('Region')['Sales'].sum()
+
+    with profiling.stage('charts'):
+        # Crea la gráfica de barras con Plotly Express
+        fig = px.bar(sales_by_region, 
+                     x=sales_by_region.index, 
+                     y='Sales', 
+                     title='Ventas Acumuladas por Región',
+                     labels={'Sales': 'Ventas', 'x': 'Región'})
     
-    st.plotly_chart(fig)
+        st.plotly_chart(fig)
 
 except FileNotFoundError:
     st.error("Error: El archivo 'SalidaFinal.xlsx' no se encuentra.")
@@ -34,23 +48,30 @@ except Exception as e:
 with st.sidebar:
 # Aplica los filtros
 # Filtro para la columna "Region"
-  region_filter = st.selectbox("Selecciona una región:", df['Region'].unique())
-  df_filtered = df[df['Region'] == region_filter]
+  region_filter = st.selectbox("Selecciona una región:", filter_index.values('Region'))
 
 # Segundo filtro para la columna "State" basado en el filtro de "Region"
-  state_filter = st.selectbox("Selecciona un estado:", df_filtered['State'].unique())
-  df_filtered = df_filtered[df_filtered['State'] == state_filter]
+  state_filter = st.selectbox("Selecciona un estado:",
+                              filter_index.values('State', {'Region': [region_filter]}))
+  with profiling.stage('filter', rows_in=len(df)) as etapa:
+    df_filtered = filter_index.select({'Region': [region_filter], 'State': [state_filter]})
+    etapa.rows_out = len(df_filtered)
 
 
 
 
 # Muestra el DataFrame filtrado
-st.dataframe(df_filtered)
+with profiling.stage('table', rows_in=len(df_filtered)):
+    paged_dataframe(df_filtered, key='ventas_filtradas', file_name='ventas_filtradas.csv')
 
 # Gráfica de pastel para la columna "Category"
-category_counts = df_filtered['Category'].value_counts()
-fig_pie = px.pie(category_counts, 
-                     values=category_counts.values, 
-                     names=category_counts.index, 
-                     title='Distribución de Categorías')
-st.plotly_chart(fig_pie)
+with profiling.stage('charts'):
+    category_counts = df_filtered['Category'].value_counts()
+    category_counts = category_counts[category_counts > 0]
+    fig_pie = px.pie(category_counts, 
+                         values=category_counts.values, 
+                         names=category_counts.index, 
+                         title='Distribución de Categorías')
+    st.plotly_chart(fig_pie)
+
+profiling.finish()
@@ -1,17 +1,22 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
+import profiling
+from registry import dataset_for_path, warm_up
+from top_k import load_top_k
+
+# Columns used by this dashboard; the rest of the workbook is never loaded
+COLUMNS = ['Region', 'Product Name', 'Sales', 'Profit']
+
 # Function to load the data
-@st.cache_data
+@profiling.profiled('load')
 def load_data(file_path):
-    df = pd.read_excel(file_path)
+    df = dataset_for_path(file_path, columns=COLUMNS)
     return df
 
 # Function to create the top selling products bar chart
-def plot_top_selling_products(df):
-    product_sales = df.groupby('Product Name')['Sales'].sum().sort_values(ascending=False)
-    top_5_products = product_sales.head(5)
+def plot_top_selling_products(top_products, filters):
+    top_5_products = top_products.top(5, 'Sales', filters)
     fig = px.bar(top_5_products, x=top_5_products.index, y=top_5_products.values,
                  labels={'x': 'Product Name', 'y': 'Sales'},
                  title='Top 5 Selling Products')
@@ -19,9 +24,8 @@ def plot_top_selling_products(df):
     return fig
 
 # Function to create the top profitable products bar chart
-def plot_top_profitable_products(df):
-    product_profit = df.groupby('Product Name')['Profit'].sum().sort_values(ascending=False)
-    top_5_profitable_products = product_profit.head(5)
+def plot_top_profitable_products(top_products, filters):
+    top_5_profitable_products = top_products.top(5, 'Profit', filters)
     fig = px.bar(top_5_profitable_products, x=top_5_profitable_products.index, y=top_5_profitable_products.values,
                  labels={'x': 'Product Name', 'y': 'Profit'},
                  title='Top 5 Most Profitable Products')
@@ -31,19 +35,26 @@ def plot_top_profitable_products(df):
 # Main Streamlit app
 def main():
     st.title("Product Analysis Dashboard")
+    warm_up()
+    # Tiempos por etapa de esta ejecución (panel opcional en la barra lateral y log)
+    profiling.start('dashboardVentas2025')
 
     file_path = 'SalidaFinal.xlsx'
     df = load_data(file_path)
+    # Per-region partial sums of every product, shared across sessions
+    top_products = load_top_k(file_path, partitions=('Region',), date_column=None)
 
     # Add Region Filter to Sidebar
     st.sidebar.header("Filtro por Región")
     regions = ['Todas'] + list(df['Region'].unique())
     selected_region = st.sidebar.selectbox("Selecciona una Región", regions)
 
-    if selected_region != 'Todas':
-        filtered_df = df[df['Region'] == selected_region]
-    else:
-        filtered_df = df.copy()
+    with profiling.stage('filter', rows_in=len(df)) as etapa:
+        if selected_region != 'Todas':
+            filtered_df = df[df['Region'] == selected_region]
+        else:
+            filtered_df = df.copy()
+        etapa.rows_out = len(filtered_df)
 
     # Add Checkbox to Sidebar to show/hide DataFrame
     st.sidebar.header("Mostrar Datos")
@@ -55,15 +66,19 @@ def main():
         st.dataframe(filtered_df.head())
 
 
-    st.write("## Top 5 Selling Products")
-    sales_fig = plot_top_selling_products(filtered_df)
-    st.plotly_chart(sales_fig)
+    filters = None if selected_region == 'Todas' else {'Region': [selected_region]}
+    with profiling.stage('charts', rows_in=len(filtered_df)):
+        st.write("## Top 5 Selling Products")
+        sales_fig = plot_top_selling_products(top_products, filters)
+        st.plotly_chart(sales_fig)
+
+        st.write("## Top 5 Most Profitable Products")
+        profit_fig = plot_top_profitable_products(top_products, filters)
+        st.plotly_chart(profit_fig)
 
-    st.write("## Top 5 Most Profitable Products")
-    profit_fig = plot_top_profitable_products(filtered_df)
-    st.plotly_chart(profit_fig)
+    st.write(filtered_df.dtypes.astype(str))
 
-    st.write(filtered_df.dtypes)
+    profiling.finish()
 
 if __name__ == "__main__":
     main()
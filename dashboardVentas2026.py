@@ -3,18 +3,39 @@ import pandas as pd
 import plotly.express as px
 import numpy as np # Added for log transformation
 
+from agg_cache import cache_key, shared_cache
+import charts
+from data_cache import file_signature
+from downsample import RESOLUTION_NAMES, time_series
+from figure_cache import cached_figure, shared_figure_cache
+from filter_index import load_filter_index
+import profiling
+from registry import get_dataset, warm_up
+from sales_cube import load_cube
+from schema import STATE_ABBREVIATIONS
+from top_k import load_top_k
+
 st.set_page_config(layout='wide')
+# Precarga en segundo plano de todos los datos del servidor (una vez por proceso)
+warm_up()
+# Tiempos por etapa de esta ejecución (panel opcional en la barra lateral y log)
+profiling.start('dashboardVentas2026')
 
 st.title('Sales Dashboard')
 
 # Assuming df is already loaded in the Colab environment
 # To make this standalone, you might need to load the data here:
 file_path="datos/SalidaVentas.xlsx"
-df = pd.read_excel(file_path)
+# Compartido entre sesiones y actualizado incrementalmente cuando se agregan pedidos
+with profiling.stage('load') as etapa:
+    df = get_dataset('ventas_detalle')
+    cube = load_cube(file_path)
+    filter_index = load_filter_index(file_path)
+    top_products = load_top_k(file_path)
+    etapa.rows_out = len(df)
 
 # --- Data Cleaning and Preparation (if necessary, for the dashboard context) ---
-# Convert 'Order Date' to datetime for time series analysis
-df['Order Date'] = pd.to_datetime(df['Order Date'])
+# 'Order Date' already comes typed as datetime from the columnar store
 
 # --- Sidebar for Filters ---
 st.sidebar.header('Filtros')
@@ -45,28 +66,49 @@ date_range = st.sidebar.date_input(
 
 # Ensure date_range has two dates before filtering
 if len(date_range) == 2:
-    start_date = pd.to_datetime(date_range[0])
-    end_date = pd.to_datetime(date_range[1])
-    filtered_df = df[
-        (df['Region'].isin(selected_regions)) &
-        (df['Category'].isin(selected_categories)) &
-        (df['Order Date'] >= start_date) &
-        (df['Order Date'] <= end_date)
-    ]
+    cube_filters = dict(regions=selected_regions, categories=selected_categories,
+                        start_date=pd.to_datetime(date_range[0]), end_date=pd.to_datetime(date_range[1]))
 else:
-    filtered_df = df[
-        (df['Region'].isin(selected_regions)) &
-        (df['Category'].isin(selected_categories))
-    ]
+    cube_filters = dict(regions=selected_regions, categories=selected_categories)
+
+
+def compute_aggregates():
+    """Every aggregate of the page for the current filters (only on a cache miss)."""
+    filters = {'Region': selected_regions, 'Category': selected_categories}
+    start_date, end_date = cube_filters.get('start_date'), cube_filters.get('end_date')
+    with profiling.stage('filter', rows_in=len(df)) as etapa:
+        # Only the row count is needed: the rows themselves are never materialized
+        etapa.rows_out = rows = int(filter_index.mask(filters, start_date=start_date, end_date=end_date).sum())
+    sales_by_state = cube.query(['State'], measures=['Sales'], **cube_filters)
+    sales_by_state['State_Code'] = sales_by_state['State'].map(STATE_ABBREVIATIONS)
+    # Apply logarithmic transformation for better color distribution
+    sales_by_state['Log_Sales'] = np.log1p(sales_by_state['Sales']) # log1p(x) computes log(1+x)
+    return {
+        'rows': rows,
+        'totals': cube.totals(**cube_filters),
+        'over_time': cube.query(['Order Date'], measures=['Sales', 'Profit'], **cube_filters),
+        'by_region': cube.query(['Region'], measures=['Sales'], **cube_filters),
+        'top_products': top_products.top(10, 'Sales', filters, start_date, end_date).reset_index(),
+        'by_state': sales_by_state,
+    }
+
+
+# Compartido entre sesiones: las combinaciones de filtros populares no vuelven a tocar los datos
+# (los resultados son de solo lectura)
+aggregate_cache = shared_cache()
+with profiling.stage('aggregate'):
+    aggregates = aggregate_cache.get_or_compute(
+        cache_key('dashboardVentas2026', file_signature(file_path), **cube_filters), compute_aggregates)
 
 # Display message if no data is available after filtering
-if filtered_df.empty:
+if aggregates['rows'] == 0:
     st.warning('No hay datos disponibles para la selección actual de filtros.')
 else:
     # --- Key Performance Indicators (KPIs) ---
-    total_sales = filtered_df['Sales'].sum()
-    total_profit = filtered_df['Profit'].sum()
-    total_quantity = filtered_df['Quantity'].sum()
+    totals = aggregates['totals']
+    total_sales = totals['Sales']
+    total_profit = totals['Profit']
+    total_quantity = int(totals['Quantity'])
 
     st.subheader('Indicadores Clave de Desempeño (KPIs)')
     col1, col2, col3 = st.columns(3)
@@ -80,71 +122,64 @@ else:
     st.markdown('---')
 
     # --- Sales and Profit Over Time ---
+    # Figuras guardadas como JSON: con los mismos agregados no se vuelven a construir
     st.subheader('Ventas y Ganancias a lo Largo del Tiempo')
-    sales_profit_over_time = filtered_df.groupby('Order Date')[['Sales', 'Profit']].sum().reset_index()
-    fig_time = px.line(sales_profit_over_time, x='Order Date', y=['Sales', 'Profit'],
-                       title='Ventas y Ganancias Diarias',
-                       labels={'value': 'Monto', 'Order Date': 'Fecha del Pedido'})
-    st.plotly_chart(fig_time, use_container_width=True)
+    # Día/semana/mes según el rango elegido, y como máximo unos cientos de puntos por serie
+    resolution = st.radio('Resolución', ['Automática'] + list(RESOLUTION_NAMES.values()),
+                          horizontal=True, key='resolucion_tiempo')
+    with profiling.stage('charts', rows_in=len(aggregates['over_time'])) as etapa:
+        over_time, rule = time_series(
+            aggregates['over_time'], 'Order Date', ['Sales', 'Profit'],
+            start=cube_filters.get('start_date'), end=cube_filters.get('end_date'),
+            rule={name: rule for rule, name in RESOLUTION_NAMES.items()}.get(resolution)
+        )
+        etapa.rows_out = len(over_time)
+        fig_time = cached_figure(charts.line, over_time, x='Order Date', y='value', color='variable',
+                                 title=f'Ventas y Ganancias por {RESOLUTION_NAMES[rule]}',
+                                 labels={'value': 'Monto', 'Order Date': 'Fecha del Pedido'})
+        st.plotly_chart(fig_time, use_container_width=True)
 
     st.markdown('---')
 
 
     # --- Sales by Region ---
     st.subheader('Ventas por Región')
-    sales_by_region = filtered_df.groupby('Region')['Sales'].sum().reset_index()
-    fig_region = px.bar(sales_by_region, x='Region', y='Sales', title='Ventas Totales por Región',
-                        labels={'Sales': 'Ventas Totales', 'Region': 'Región'}, color='Region')
-    st.plotly_chart(fig_region, use_container_width=True)
+    with profiling.stage('charts'):
+        fig_region = cached_figure(charts.bar, aggregates['by_region'], x='Region', y='Sales',
+                                   title='Ventas Totales por Región',
+                                   labels={'Sales': 'Ventas Totales', 'Region': 'Región'}, color='Region')
+        st.plotly_chart(fig_region, use_container_width=True)
 
     st.markdown('---')
 
     # --- Top 10 Products by Sales ---
     st.subheader('Top 10 Productos por Ventas')
-    top_products = filtered_df.groupby('Product Name')['Sales'].sum().nlargest(10).reset_index()
-    fig_products = px.bar(top_products, x='Sales', y='Product Name', orientation='h',
-                          title='Top 10 Productos Más Vendidos',
-                          labels={'Sales': 'Ventas Totales', 'Product Name': 'Nombre del Producto'})
-    st.plotly_chart(fig_products, use_container_width=True)
+    with profiling.stage('charts'):
+        fig_products = cached_figure(charts.bar, aggregates['top_products'], x='Sales', y='Product Name', orientation='h',
+                                     title='Top 10 Productos Más Vendidos',
+                                     labels={'Sales': 'Ventas Totales', 'Product Name': 'Nombre del Producto'})
+        st.plotly_chart(fig_products, use_container_width=True)
 
     st.markdown('---')
 
     # --- Sales by State Map ---
     st.subheader('Ventas por Estado (USA)')
-
-    # Define state abbreviations within the script for standalone execution
-    state_abbreviations = {
-        'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
-        'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'District of Columbia': 'DC',
-        'Florida': 'FL', 'Georgia': 'GA', 'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL',
-        'Indiana': 'IN', 'Iowa': 'IA', 'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA',
-        'Maine': 'ME', 'Maryland': 'MD', 'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN',
-        'Mississippi': 'MS', 'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV',
-        'New Hampshire': 'NH', 'New Jersey': 'NJ', 'New Mexico': 'NM', 'New York': 'NY',
-        'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK', 'Oregon': 'OR',
-        'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC', 'South Dakota': 'SD',
-        'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT', 'Virginia': 'VA',
-        'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY'
-    }
-
-    sales_by_state = filtered_df.groupby('State')['Sales'].sum().reset_index()
-    sales_by_state['State_Code'] = sales_by_state['State'].map(state_abbreviations)
-
-    # Apply logarithmic transformation for better color distribution
-    sales_by_state['Log_Sales'] = np.log1p(sales_by_state['Sales']) # log1p(x) computes log(1+x)
-
-    fig_state = px.choropleth(
-        sales_by_state,
-        locations='State_Code', # Use the new 'State_Code' column for locations
-        locationmode='USA-states',
-        color='Log_Sales', # Use the log-transformed column for color mapping
-        scope='usa',
-        color_continuous_scale='Plasma', # Changed color scale to 'Plasma' for better contrast
-        title='Ventas Totales por Estado en USA (Escala Logarítmica)',
-        labels={'Log_Sales': 'Log de Ventas Totales', 'State': 'Estado'},
-        hover_name='State', # Display original state name on hover
-        hover_data={'Sales': ':.2f', 'Log_Sales': False} # Display original sales value on hover, hide log_sales
-    )
-    fig_state.update_layout(geo_scope='usa') # Ensures the map is centered on USA
-    st.plotly_chart(fig_state, use_container_width=True)
+    with profiling.stage('charts'):
+        fig_state = cached_figure(
+            px.choropleth,
+            aggregates['by_state'],
+            locations='State_Code', # Use the new 'State_Code' column for locations
+            locationmode='USA-states',
+            color='Log_Sales', # Use the log-transformed column for color mapping
+            scope='usa',
+            color_continuous_scale='Plasma', # Changed color scale to 'Plasma' for better contrast
+            title='Ventas Totales por Estado en USA (Escala Logarítmica)',
+            labels={'Log_Sales': 'Log de Ventas Totales', 'State': 'Estado'},
+            hover_name='State', # Display original state name on hover
+            hover_data={'Sales': ':.2f', 'Log_Sales': False}, # Display original sales value on hover, hide log_sales
+            layout=dict(geo_scope='usa') # Ensures the map is centered on USA
+        )
+        st.plotly_chart(fig_state, use_container_width=True)
     st.markdown('---')
+
+profiling.finish(extra={'agg_cache': aggregate_cache.stats(), 'figure_cache': shared_figure_cache().stats()})
@@ -0,0 +1,102 @@
+import streamlit as st
+import plotly.express as px
+
+from flights import CAUSE_COLUMNS
+from flights_agg import load_flight_aggregates
+import profiling
+from registry import DATASETS, warm_up
+
+st.set_page_config(layout='wide')
+# Precarga en segundo plano de todos los datos del servidor (una vez por proceso)
+warm_up()
+# Tiempos por etapa de esta ejecución (panel opcional en la barra lateral y log)
+profiling.start('dashboardVuelos')
+
+st.title('Retrasos de Vuelos LAX → JFK ✈️')
+
+# Agregados calculados en una sola pasada por bloques (memoria acotada); compartidos entre sesiones
+with profiling.stage('load'):
+    aggregates = load_flight_aggregates(DATASETS['vuelos'][0])
+
+# --- Sidebar for Filters ---
+st.sidebar.header('Filtros')
+
+airlines = aggregates.airlines()
+selected_airlines = st.sidebar.multiselect(
+    'Selecciona la Aerolínea',
+    options=airlines,
+    default=airlines
+)
+
+years = aggregates.years()
+year_range = st.sidebar.slider('Selecciona los Años', int(years[0]), int(years[-1]),
+                               (int(years[0]), int(years[-1])))
+filters = dict(airlines=selected_airlines, years=year_range)
+
+day_names = {1: 'Lun', 2: 'Mar', 3: 'Mié', 4: 'Jue', 5: 'Vie', 6: 'Sáb', 7: 'Dom'}
+delay_labels = {'mean_delay': 'Retraso medio (min)', 'p50': 'Mediana (min)', 'p90': 'Percentil 90 (min)',
+                'flights': 'Vuelos'}
+
+with profiling.stage('aggregate'):
+    totals = aggregates.totals(**filters)
+if totals['flights'] == 0:
+    st.warning('No hay datos disponibles para la selección actual de filtros.')
+else:
+    # --- Key Performance Indicators (KPIs) ---
+    st.subheader('Indicadores Clave')
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(label='Vuelos', value=f"{int(totals['flights']):,}")
+    with col2:
+        st.metric(label='Retraso Medio de Llegada', value=f"{totals['mean_delay']:.1f} min")
+    with col3:
+        st.metric(label='Retraso Mediano / P90', value=f"{totals['p50']:.0f} / {totals['p90']:.0f} min")
+    with col4:
+        st.metric(label='Llegadas a Tiempo (≤ 15 min)', value=f"{totals['on_time_share']:.1%}")
+
+    st.markdown('---')
+
+    # --- Delay by Airline ---
+    st.subheader('Retraso por Aerolínea')
+    by_airline = aggregates.query('Reporting_Airline', **filters)
+    fig_airline = px.bar(by_airline, x='Reporting_Airline', y=['mean_delay', 'p50', 'p90'],
+                         barmode='group', hover_data=['flights'],
+                         title='Retraso de Llegada por Aerolínea (media, mediana y P90)',
+                         labels={**delay_labels, 'Reporting_Airline': 'Aerolínea', 'value': 'Minutos',
+                                 'variable': 'Estadístico'})
+    st.plotly_chart(fig_airline, width='stretch')
+
+    col_left, col_right = st.columns(2)
+    with col_left:
+        by_month = aggregates.query('Month', **filters)
+        fig_month = px.line(by_month, x='Month', y=['mean_delay', 'p90'], markers=True,
+                            title='Retraso por Mes',
+                            labels={**delay_labels, 'Month': 'Mes', 'value': 'Minutos',
+                                    'variable': 'Estadístico'})
+        fig_month.update_layout(xaxis=dict(tickmode='linear', dtick=1))
+        st.plotly_chart(fig_month, width='stretch')
+    with col_right:
+        by_day = aggregates.query('DayOfWeek', **filters)
+        by_day['Día'] = by_day['DayOfWeek'].map(day_names)
+        fig_day = px.bar(by_day, x='Día', y='mean_delay', hover_data=['p50', 'p90', 'flights'],
+                         title='Retraso Medio por Día de la Semana',
+                         labels=delay_labels)
+        st.plotly_chart(fig_day, width='stretch')
+
+    # --- Delay by scheduled departure hour ---
+    st.subheader('Retraso por Hora de Salida Programada')
+    by_hour = aggregates.query('DepHour', **filters)
+    fig_hour = px.bar(by_hour, x='DepHour', y='mean_delay', hover_data=['p50', 'p90', 'flights'],
+                      title='Retraso Medio de Llegada por Hora de Salida',
+                      labels={**delay_labels, 'DepHour': 'Hora programada'})
+    fig_hour.update_layout(xaxis=dict(tickmode='linear', dtick=1))
+    st.plotly_chart(fig_hour, width='stretch')
+
+    # --- Delay causes ---
+    st.subheader('Causas del Retraso')
+    causes = totals[CAUSE_COLUMNS].rename_axis('Causa').reset_index(name='Minutos')
+    fig_causes = px.pie(causes, values='Minutos', names='Causa',
+                        title='Minutos de Retraso por Causa')
+    st.plotly_chart(fig_causes, width='stretch')
+
+profiling.finish()
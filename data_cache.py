@@ -0,0 +1,196 @@
+import contextlib
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+import xlsx_stream
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Directory where the Parquet copies of the workbooks are kept
+CACHE_DIR = Path(os.environ.get('DASHBOARD_CACHE_DIR', '.cache'))
+
+# python-calamine (Rust) parses .xlsx several times faster than openpyxl
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None  # pandas default (openpyxl)
+
+# Sheets with more XML than this are streamed by xlsx_stream instead: 2-3x
+# slower than calamine, but rows are packed into typed arrays as they are
+# parsed, so peak memory stays well below materializing every cell first.
+# Only worth it for sheets whose cells alone would take gigabytes
+STREAM_SHEET_BYTES = int(float(os.environ.get('DASHBOARD_XLSX_STREAM_MB', 256)) * 1024 * 1024)
+
+
+def file_signature(path):
+    """Return (mtime_ns, size) for path; changes whenever the file is rewritten."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def tmp_path(target):
+    """Temp name next to target, unique per process and thread, for write + os.replace."""
+    return target.with_name(f"{target.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on `path` (created if missing) across processes.
+
+    Threads of one process exclude each other too: each call opens its own
+    descriptor. Used around cache writes that several processes (dashboard
+    replicas, the registry prebuild, `python registry.py`) may run at once.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a+b') as archivo:
+        if fcntl is not None:
+            fcntl.flock(archivo, fcntl.LOCK_EX)
+        else:
+            archivo.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK gives up after ~10 s, keep waiting
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(archivo, fcntl.LOCK_UN)
+            else:
+                archivo.seek(0)
+                msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:8]
+
+
+def _cache_prefix(path, sheet_name):
+    # One prefix per resolved source path + sheet
+    return f"{Path(path).stem}-{_digest(f'{Path(path).resolve()}|{sheet_name}')}"
+
+
+def _cache_path(path, sheet_name, signature):
+    # Key = resolved source path + sheet + mtime + size
+    return CACHE_DIR / f"{_cache_prefix(path, sheet_name)}-{_digest(f'{signature[0]}|{signature[1]}')}.parquet"
+
+
+def _drop_stale(path, sheet_name, keep):
+    # Old versions of the same sheet are no longer reachable, remove them
+    for old in CACHE_DIR.glob(f"{_cache_prefix(path, sheet_name)}-*.parquet"):
+        if old != keep:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+def write_parquet(df, target):
+    """Write df to target atomically (temp file + rename)."""
+    # Columns mixing numbers and text (e.g. 'edad') cannot be typed by Arrow,
+    # store them as strings instead of failing the whole conversion
+    out = df.copy()
+    for col in out.columns:
+        if out[col].dtype == object:
+            out[col] = out[col].astype('string')
+    tmp = tmp_path(target)
+    out.to_parquet(tmp, index=False)
+    os.replace(tmp, target)
+
+
+def _streamed(path, sheet_name, kwargs):
+    # xlsx_stream covers .xlsx sheets read with skiprows/nrows only
+    if Path(path).suffix.lower() not in ('.xlsx', '.xlsm') or sheet_name is None:
+        return False
+    if set(kwargs) - {'skiprows', 'nrows'}:
+        return False
+    if EXCEL_ENGINE is None:
+        return True  # several times faster than openpyxl
+    try:
+        return xlsx_stream.sheet_size(path, sheet_name) > STREAM_SHEET_BYTES
+    except Exception:
+        return False  # not a readable workbook: let pandas report it
+
+
+def read_excel(path, sheet_name=0, columns=None, **kwargs):
+    """pd.read_excel with the fastest available engine and an optional column projection.
+
+    Large .xlsx sheets (and every .xlsx when calamine is missing) go through
+    the streaming reader of xlsx_stream, which returns the same frame.
+    """
+    usecols = list(columns) if columns is not None else None
+    if _streamed(path, sheet_name, kwargs):
+        return xlsx_stream.read_xlsx(path, sheet_name=sheet_name, usecols=usecols, **kwargs)
+    return pd.read_excel(path, sheet_name=sheet_name, usecols=usecols, engine=EXCEL_ENGINE, **kwargs)
+
+
+def _read_parquet_copy(target, columns):
+    # None when there is no usable copy (a broken one is removed)
+    if target.exists():
+        try:
+            return pd.read_parquet(target, columns=columns)
+        except Exception:
+            target.unlink(missing_ok=True)
+    return None
+
+
+def read_excel_cached(path, sheet_name=0, columns=None):
+    """Read an Excel sheet through an on-disk Parquet copy.
+
+    The workbook is parsed once with pd.read_excel; later calls read the
+    typed Parquet file while the source path, mtime and size are unchanged.
+    `columns` projects the Parquet read, so unused columns are never loaded.
+    """
+    signature = file_signature(path)
+    target = _cache_path(path, sheet_name, signature)
+    df = _read_parquet_copy(target, columns)
+    if df is not None:
+        return df
+
+    with contextlib.ExitStack() as stack:
+        # Replicas, the registry prebuild and `python registry.py` may build
+        # the same copy at once: one parses, the others wait and read it
+        try:
+            stack.enter_context(file_lock(CACHE_DIR / f"{_cache_prefix(path, sheet_name)}.lock"))
+        except OSError as e:
+            print(f"No se pudo bloquear la caché de '{path}': {e}")
+        df = _read_parquet_copy(target, columns)
+        if df is not None:
+            return df
+
+        df = read_excel(path, sheet_name=sheet_name)
+        try:
+            write_parquet(df, target)
+            _drop_stale(path, sheet_name, target)
+        except Exception as e:
+            # The cache is an optimization, the dashboard still works without it
+            print(f"No se pudo escribir la caché de '{path}': {e}")
+    return df if columns is None else df[list(columns)]
+
+
+@st.cache_data(show_spinner=False)
+def _load_excel(path, sheet_name, signature, columns):
+    return read_excel_cached(path, sheet_name=sheet_name, columns=columns)
+
+
+def load_excel(path, sheet_name=0, columns=None):
+    """Cached entry point used by the dashboards.
+
+    Keeps the frame in memory between reruns and sessions; the file
+    signature is part of the key so an edited workbook is picked up.
+    """
+    columns = tuple(columns) if columns is not None else None
+    return _load_excel(path, sheet_name, file_signature(path), columns)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+# Points kept per trace of a line chart
+MAX_POINTS = 500
+# Finest resolution with at most this many buckets in the selected range is used
+MAX_BUCKETS = 400
+# Resolution -> approximate days per bucket
+RESOLUTIONS = {'D': 1, 'W': 7, 'M': 30.44}
+RESOLUTION_NAMES = {'D': 'Día', 'W': 'Semana', 'M': 'Mes'}
+
+
+def choose_resolution(start, end, max_buckets=MAX_BUCKETS):
+    """'D', 'W' or 'M': the finest one giving at most `max_buckets` buckets from start to end."""
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    for rule, size in RESOLUTIONS.items():
+        if days / size <= max_buckets:
+            return rule
+    return 'M'
+
+
+def resample(df, x, columns, rule):
+    """Sum `columns` per day/week/month of the date column `x` (one row per bucket, sorted)."""
+    if rule == 'D':
+        buckets = df[x].dt.normalize()
+    else:
+        buckets = df[x].dt.to_period(rule).dt.start_time
+    return df.groupby(buckets.rename(x))[columns].sum().reset_index()
+
+
+def lttb(x, y, threshold):
+    """Positions of the `threshold` points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the mean of the next bucket, so peaks and dips survive.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    # threshold - 2 buckets over the middle points, then the last point alone
+    edges = np.append(np.linspace(1, n - 1, threshold - 1).astype(np.int64), n)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2]
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def downsample(df, x, columns, max_points=MAX_POINTS):
+    """Long frame (x, 'variable', 'value') with at most `max_points` points per column.
+
+    Each column is reduced with lttb() on its own; plot it with
+    px.line(..., y='value', color='variable').
+    """
+    positions = df[x].to_numpy()
+    if np.issubdtype(positions.dtype, np.datetime64):
+        positions = positions.astype('int64')
+    traces = []
+    for col in columns:
+        valid = df[col].notna().to_numpy()
+        keep = lttb(positions[valid], df[col].to_numpy()[valid], max_points)
+        trace = df.loc[valid, [x, col]].iloc[keep].rename(columns={col: 'value'})
+        trace.insert(1, 'variable', col)
+        traces.append(trace)
+    return pd.concat(traces, ignore_index=True)
+
+
+def time_series(df, x, columns, start=None, end=None, rule=None, max_points=MAX_POINTS):
+    """Chart-ready series: resampled to `rule` (chosen from start/end when None) and downsampled.
+
+    Returns (long frame, rule). start/end default to the first/last date of df.
+    """
+    if rule is None:
+        if len(df) == 0:
+            rule = 'D'
+        else:
+            start = df[x].min() if start is None else start
+            end = df[x].max() if end is None else end
+            rule = choose_resolution(start, end)
+    return downsample(resample(df, x, columns, rule), x, columns, max_points), rule
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from plotly.basedatatypes import BaseFigure
+
+from agg_cache import AggregateCache
+
+# Upper bound for the cached figure JSON of the whole process
+MAX_BYTES = int(float(os.environ.get('DASHBOARD_FIGURE_CACHE_MB', 32)) * 1024 * 1024)
+
+
+class PreserializedFigure(BaseFigure):
+    """Plotly figure kept as its JSON, accepted by st.plotly_chart as is.
+
+    st.plotly_chart re-validates plain dicts by building a go.Figure from
+    them; a BaseFigure is trusted and only asked for to_dict(), so the
+    cached spec reaches the browser without Plotly's validation.
+    """
+
+    def __init__(self, spec):
+        # BaseFigure.__init__ would build and validate the figure: skipped
+        object.__setattr__(self, 'spec', spec)
+
+    def to_dict(self):
+        return json.loads(self.spec)
+
+    def to_plotly_json(self):
+        return self.to_dict()
+
+    def to_json(self, *args, **kwargs):
+        return self.spec
+
+    def __repr__(self):
+        return f"PreserializedFigure({len(self.spec):,} bytes)"
+
+
+def _digest_values(values):
+    if isinstance(values, (pd.DataFrame, pd.Series, pd.Index)):
+        hashed = pd.util.hash_pandas_object(values, index=not isinstance(values, pd.Index))
+        shape = list(values.columns) if isinstance(values, pd.DataFrame) else [values.name]
+        dtypes = values.dtypes.astype(str).tolist() if isinstance(values, pd.DataFrame) else [str(values.dtype)]
+        return ['frame', shape, dtypes, hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()]
+    if isinstance(values, np.ndarray):
+        return _digest_values(pd.Series(values))
+    if isinstance(values, dict):
+        return {str(k): _digest_values(v) for k, v in values.items()}
+    if isinstance(values, (list, tuple)):
+        return [_digest_values(v) for v in values]
+    return values
+
+
+def figure_key(build, data, **params):
+    """Hash of the builder, the content of `data` and the chart parameters."""
+    payload = json.dumps([f'{build.__module__}.{build.__qualname__}', _digest_values(data),
+                          _digest_values(params)], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+@st.cache_resource(show_spinner=False)
+def shared_figure_cache():
+    """Figure JSON shared by every session of this server process."""
+    return AggregateCache(max_bytes=MAX_BYTES)
+
+
+def cached_figure(build, data, layout=None, xaxes=None, **params):
+    """build(data, **params) (e.g. px.bar), memoized as JSON on its inputs.
+
+    `layout` / `xaxes` are applied with update_layout / update_xaxes.
+    Reruns with the same aggregated frame and parameters skip Plotly's
+    figure building and validation and reuse the stored spec.
+    """
+    key = figure_key(build, data, layout=layout, xaxes=xaxes, **params)
+
+    def render():
+        fig = build(data, **params)
+        if layout:
+            fig.update_layout(**layout)
+        if xaxes:
+            fig.update_xaxes(**xaxes)
+        return fig.to_json()
+
+    return PreserializedFigure(shared_figure_cache().get_or_compute(key, render))
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_cache import file_signature
+from registry import dataset_for_path
+
+
+class FilterIndex:
+    """Row bitmaps for the sidebar filters of the sales dashboards.
+
+    Each categorical column keeps one packed bitmap (np.packbits) per value,
+    and the date column a sorted order for binary-search range lookups.
+    A filter is then OR inside a column, AND across columns plus a slice,
+    instead of rebuilding isin/comparison masks over the whole frame.
+    """
+
+    def __init__(self, df, columns=('Region', 'State', 'Category'), date_column='Order Date'):
+        frame = df.copy()
+        self.n_rows = len(frame)
+        self.bitmaps = {}
+        for col in columns:
+            # Categories in order of first appearance, like Series.unique()
+            frame[col] = pd.Categorical(frame[col], categories=pd.unique(frame[col].dropna()))
+            codes = frame[col].cat.codes.to_numpy()
+            self.bitmaps[col] = {
+                value: np.packbits(codes == code)
+                for code, value in enumerate(frame[col].cat.categories)
+            }
+        self.date_column = date_column
+        if date_column is not None:
+            frame[date_column] = pd.to_datetime(frame[date_column])
+            dates = frame[date_column].to_numpy()
+            self.date_order = np.argsort(dates, kind='stable')
+            self.sorted_dates = dates[self.date_order]
+        self.frame = frame
+
+    def _column_bitmap(self, col, values):
+        bitmaps = self.bitmaps[col]
+        values = [v for v in values if v in bitmaps]
+        if len(values) == len(bitmaps):
+            return None  # every value selected, the column doesn't filter
+        result = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        for value in values:
+            np.bitwise_or(result, bitmaps[value], out=result)
+        return result
+
+    def _date_positions(self, start_date, end_date):
+        lo, hi = 0, len(self.sorted_dates)
+        if start_date is not None:
+            lo = np.searchsorted(self.sorted_dates, np.datetime64(pd.to_datetime(start_date)), side='left')
+        if end_date is not None:
+            hi = np.searchsorted(self.sorted_dates, np.datetime64(pd.to_datetime(end_date)), side='right')
+        return self.date_order[lo:hi]
+
+    def mask(self, filters=None, start_date=None, end_date=None):
+        """Boolean row mask for {column: selected values} and an inclusive date range."""
+        packed = None
+        for col, values in (filters or {}).items():
+            bitmap = self._column_bitmap(col, values)
+            if bitmap is None:
+                continue
+            packed = bitmap if packed is None else np.bitwise_and(packed, bitmap)
+        if packed is None:
+            mask = np.ones(self.n_rows, dtype=bool)
+        else:
+            mask = np.unpackbits(packed, count=self.n_rows).astype(bool)
+        if start_date is not None or end_date is not None:
+            in_range = np.zeros(self.n_rows, dtype=bool)
+            in_range[self._date_positions(start_date, end_date)] = True
+            mask &= in_range
+        return mask
+
+    def select(self, filters=None, start_date=None, end_date=None):
+        """Filtered rows, in the original row order."""
+        return self.frame[self.mask(filters, start_date, end_date)]
+
+    def values(self, column, filters=None):
+        """Values of `column` still present under `filters` (for cascading widgets)."""
+        mask = self.mask(filters)
+        packed = np.packbits(mask)
+        return [value for value, bitmap in self.bitmaps[column].items()
+                if np.bitwise_and(bitmap, packed).any()]
+
+
+@st.cache_resource(show_spinner=False)
+def _load_filter_index(file_path, signature):
+    return FilterIndex(dataset_for_path(file_path))
+
+
+def load_filter_index(file_path):
+    """Build the index once per workbook version and share it across sessions."""
+    return _load_filter_index(file_path, file_signature(file_path))
@@ -0,0 +1,64 @@
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# BTS on-time columns and the compact dtypes they are read with
+HHMM_COLUMNS = ['CRSDepTime', 'CRSArrTime', 'DepTime', 'ArrTime']
+DELAY_COLUMNS = ['ArrDelay', 'ArrDelayMinutes', 'CarrierDelay', 'WeatherDelay', 'NASDelay',
+                 'SecurityDelay', 'LateAircraftDelay', 'DepDelay', 'DepDelayMinutes',
+                 'DivDistance', 'DivArrDelay']
+CAUSE_COLUMNS = ['CarrierDelay', 'WeatherDelay', 'NASDelay', 'SecurityDelay', 'LateAircraftDelay']
+CATEGORY_COLUMNS = ['Reporting_Airline', 'Origin', 'Dest']
+
+READ_DTYPES = {
+    'Month': 'int8',
+    'DayOfWeek': 'int8',
+    **{col: 'category' for col in CATEGORY_COLUMNS},
+    **{col: 'string' for col in HHMM_COLUMNS},
+    # Read as float (NA-safe), narrowed to Int16 per chunk
+    **{col: 'float32' for col in DELAY_COLUMNS},
+}
+
+
+def hhmm_to_minutes(values):
+    """'HHMM' strings (e.g. '0615', '2400') to minutes after midnight as Int16."""
+    numbers = pd.to_numeric(values, errors='coerce')
+    return ((numbers // 100) * 60 + numbers % 100).astype('Int16')
+
+
+def _convert_chunk(chunk):
+    for col in HHMM_COLUMNS:
+        if col in chunk.columns:
+            chunk[col] = hhmm_to_minutes(chunk[col])
+    for col in DELAY_COLUMNS:
+        if col in chunk.columns:
+            chunk[col] = chunk[col].round().astype('Int16')
+    if 'FlightDate' in chunk.columns:
+        chunk['FlightDate'] = pd.to_datetime(chunk['FlightDate'], format='%Y-%m-%d')
+    return chunk
+
+
+def iter_flight_chunks(path, chunksize=250_000, usecols=None):
+    """Typed chunks of a BTS on-time CSV.
+
+    Every chunk already carries the compact dtypes, so memory stays bounded
+    by `chunksize` no matter how large the extract is. HHMM times become
+    minutes after midnight (Int16).
+    """
+    dtypes = READ_DTYPES if usecols is None else {c: t for c, t in READ_DTYPES.items() if c in usecols}
+    reader = pd.read_csv(path, dtype=dtypes, usecols=usecols, chunksize=chunksize,
+                         na_values=['NA', ''], keep_default_na=False)
+    for chunk in reader:
+        yield _convert_chunk(chunk)
+
+
+def read_flights(path, chunksize=250_000, usecols=None):
+    """Whole BTS on-time CSV as one compact DataFrame, read in chunks."""
+    chunks = list(iter_flight_chunks(path, chunksize=chunksize, usecols=usecols))
+    if not chunks:
+        return pd.DataFrame(columns=usecols or list(READ_DTYPES))
+    df = pd.concat(chunks, ignore_index=True)
+    # Chunks infer their own categories; concat would fall back to object
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = union_categoricals([chunk[col] for chunk in chunks])
+    return df
@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_cache import file_signature
+from flights import CAUSE_COLUMNS, iter_flight_chunks
+
+# Finest grain kept by the engine; every chart rolls up from it
+KEYS = ['Year', 'Reporting_Airline', 'Month', 'DayOfWeek', 'DepHour']
+# Levels that have their own delay histogram (for percentiles)
+HISTOGRAM_LEVELS = ['Reporting_Airline', 'Month', 'DayOfWeek', 'DepHour']
+USECOLS = ['FlightDate', 'Reporting_Airline', 'Month', 'DayOfWeek', 'CRSDepTime', 'ArrDelay'] + CAUSE_COLUMNS
+ON_TIME_MINUTES = 15
+
+
+class FlightDelayAggregator:
+    """One-pass, bounded-memory delay statistics over BTS on-time chunks.
+
+    Each chunk is reduced to mergeable partials: counts and sums per KEYS
+    cell, and sparse ArrDelay histograms (fixed `bin_width`-minute bins) per
+    Year x Airline x level. Partials only grow with the number of distinct
+    cells, never with rows, and two aggregators combine with merge().
+    """
+
+    def __init__(self, bin_width=1, min_delay=-120, max_delay=1800):
+        self.bin_width = bin_width
+        self.min_delay = min_delay
+        self.n_bins = (max_delay - min_delay) // bin_width + 1
+        self._stats = []
+        self._histograms = {level: [] for level in HISTOGRAM_LEVELS}
+
+    def _keys(self, chunk):
+        return pd.DataFrame({
+            'Year': chunk['FlightDate'].dt.year.astype('int16'),
+            'Reporting_Airline': chunk['Reporting_Airline'].astype(str),
+            'Month': chunk['Month'],
+            'DayOfWeek': chunk['DayOfWeek'],
+            # 2400 is midnight of the next day
+            'DepHour': (chunk['CRSDepTime'] // 60 % 24).fillna(-1).astype('int8'),
+        }, index=chunk.index)
+
+    def update(self, chunk):
+        """Fold one typed chunk (see flights.iter_flight_chunks) into the partials."""
+        chunk = chunk[chunk['ArrDelay'].notna()]
+        if chunk.empty:
+            return self
+        keys = self._keys(chunk)
+        delay = chunk['ArrDelay'].astype('int32')
+        frame = keys.assign(
+            flights=1,
+            delay_sum=delay,
+            on_time=(delay <= ON_TIME_MINUTES).astype('int32'),
+            **{col: chunk[col].fillna(0).astype('int64') for col in CAUSE_COLUMNS},
+        )
+        self._stats.append(frame.groupby(KEYS, observed=True).sum())
+
+        bins = ((delay - self.min_delay) // self.bin_width).clip(0, self.n_bins - 1).astype('int16')
+        for level in HISTOGRAM_LEVELS:
+            group = ['Year', 'Reporting_Airline'] + ([level] if level != 'Reporting_Airline' else [])
+            counts = keys[group].assign(bin=bins).groupby(group + ['bin'], observed=True).size()
+            self._histograms[level].append(counts)
+        if len(self._stats) >= 16:
+            self._compact()
+        return self
+
+    def _compact(self):
+        def combine(parts):
+            if len(parts) <= 1:
+                return parts
+            merged = pd.concat(parts)
+            return [merged.groupby(level=list(range(merged.index.nlevels))).sum()]
+
+        self._stats = combine(self._stats)
+        for level in HISTOGRAM_LEVELS:
+            self._histograms[level] = combine(self._histograms[level])
+
+    def merge(self, other):
+        """Combine the partials of another aggregator (e.g. from another process)."""
+        self._stats.extend(other._stats)
+        for level in HISTOGRAM_LEVELS:
+            self._histograms[level].extend(other._histograms[level])
+        self._compact()
+        return self
+
+    @property
+    def stats(self):
+        self._compact()
+        if not self._stats:
+            return pd.DataFrame(columns=['flights', 'delay_sum', 'on_time'] + CAUSE_COLUMNS)
+        return self._stats[0]
+
+    def airlines(self):
+        return sorted(self.stats.index.get_level_values('Reporting_Airline').unique())
+
+    def years(self):
+        return sorted(self.stats.index.get_level_values('Year').unique())
+
+    @staticmethod
+    def _filter(frame, airlines, years):
+        mask = np.ones(len(frame), dtype=bool)
+        if airlines is not None:
+            mask &= frame.index.get_level_values('Reporting_Airline').isin(airlines)
+        if years is not None:
+            year = frame.index.get_level_values('Year')
+            mask &= (year >= years[0]) & (year <= years[1])
+        return frame[mask]
+
+    def _histogram(self, level, airlines, years):
+        self._compact()
+        if not self._histograms[level]:
+            return pd.Series(dtype='int64')
+        return self._filter(self._histograms[level][0], airlines, years)
+
+    def _quantiles(self, histogram, quantiles):
+        """Quantiles from bin counts indexed by bin number.
+
+        Delays are whole minutes, so the midpoint of the bin holding the
+        quantile is exact for bin_width=1 and within bin_width/2 otherwise.
+        """
+        histogram = histogram.sort_index()
+        cumulative = histogram.to_numpy().cumsum()
+        if not len(cumulative) or cumulative[-1] == 0:
+            return np.full(len(quantiles), np.nan)
+        positions = np.searchsorted(cumulative, np.asarray(quantiles) * cumulative[-1], side='left')
+        bins = histogram.index.to_numpy()[positions]
+        return self.min_delay + bins * self.bin_width + (self.bin_width - 1) / 2
+
+    def _percentiles(self, level, quantiles, airlines, years):
+        counts = self._histogram(level, airlines, years)
+        columns = [f'p{int(q * 100)}' for q in quantiles]
+        if counts.empty:
+            return pd.DataFrame(columns=columns)
+        counts = counts.groupby(level=[level, 'bin']).sum()
+        result = {value: self._quantiles(histogram.droplevel(0), quantiles)
+                  for value, histogram in counts.groupby(level=0)}
+        return pd.DataFrame.from_dict(result, orient='index', columns=columns)
+
+    def query(self, by, airlines=None, years=None, quantiles=(0.5, 0.9)):
+        """Flights, mean ArrDelay, on-time share, cause minutes and ArrDelay
+        percentiles per value of `by` (one of HISTOGRAM_LEVELS).
+
+        `airlines` is a list, `years` an inclusive (first, last) tuple.
+        """
+        stats = self._filter(self.stats, airlines, years).groupby(level=by).sum()
+        out = pd.DataFrame({
+            'flights': stats['flights'],
+            'mean_delay': stats['delay_sum'] / stats['flights'],
+            'on_time_share': stats['on_time'] / stats['flights'],
+        })
+        out = out.join(stats[CAUSE_COLUMNS]).join(self._percentiles(by, quantiles, airlines, years))
+        if by == 'DepHour':
+            out = out[out.index >= 0]
+        return out.rename_axis(by).reset_index()
+
+    def totals(self, airlines=None, years=None, quantiles=(0.5, 0.9)):
+        """Overall figures for the selection as a Series."""
+        stats = self._filter(self.stats, airlines, years).sum()
+        flights = stats['flights']
+        counts = self._histogram('Reporting_Airline', airlines, years)
+        histogram = counts.groupby(level='bin').sum() if not counts.empty else counts
+        result = {
+            'flights': flights,
+            'mean_delay': stats['delay_sum'] / flights if flights else np.nan,
+            'on_time_share': stats['on_time'] / flights if flights else np.nan,
+            **{col: stats[col] for col in CAUSE_COLUMNS},
+        }
+        for q, value in zip(quantiles, self._quantiles(histogram, quantiles)):
+            result[f'p{int(q * 100)}'] = value
+        return pd.Series(result)
+
+
+def aggregate_flights(path, chunksize=250_000, **kwargs):
+    """Stream a BTS on-time CSV through a FlightDelayAggregator in one pass."""
+    aggregator = FlightDelayAggregator(**kwargs)
+    for chunk in iter_flight_chunks(path, chunksize=chunksize, usecols=USECOLS):
+        aggregator.update(chunk)
+    return aggregator
+
+
+@st.cache_resource(show_spinner=False)
+def _load_flight_aggregates(path, signature):
+    return aggregate_flights(path)
+
+
+def load_flight_aggregates(path):
+    """Aggregates computed once per file version and shared across sessions."""
+    return _load_flight_aggregates(path, file_signature(path))
@@ -0,0 +1,256 @@
+import json
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pydeck as pdk
+import streamlit as st
+from pydeck.bindings.json_tools import default_serialize
+from pydeck.types.base import PydeckType
+
+from data_cache import CACHE_DIR, file_signature
+from registry import dataset_for_path
+
+# Resolution levels for the choropleth polygons: (minimum zoom, Douglas-Peucker
+# tolerance in degrees, decimals kept). Coarser levels for the state-wide view.
+LEVELS = [
+    (0, 0.005, 3),
+    (8, 0.001, 4),
+    (10, 0.0002, 5),
+    (12, 0.0, 6),
+]
+
+
+def level_for_zoom(zoom):
+    """Index into LEVELS for a pydeck ViewState zoom."""
+    level = 0
+    for i, (min_zoom, _, _) in enumerate(LEVELS):
+        if zoom >= min_zoom:
+            level = i
+    return level
+
+
+def _douglas_peucker(points, tolerance):
+    """Keep-mask for the Douglas-Peucker simplification of a point array."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        inner = points[first + 1:last]
+        segment = end - start
+        length = np.hypot(*segment)
+        if length == 0:
+            # Closed ring: measure against the shared start/end point
+            distances = np.hypot(*(inner - start).T)
+        else:
+            offsets = inner - start
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return keep
+
+
+def _simplify_ring(ring, tolerance, precision):
+    points = np.asarray(ring, dtype=float)[:, :2]
+    if tolerance > 0 and len(points) > 4:
+        simplified = points[_douglas_peucker(points, tolerance)]
+        # A ring needs at least 4 positions, keep the original if it collapsed
+        if len(simplified) >= 4:
+            points = simplified
+    return np.round(points, precision).tolist()
+
+
+def simplify_geojson(geojson, tolerance, precision):
+    """Copy of a Polygon/MultiPolygon FeatureCollection with simplified,
+    quantized (rounded to `precision` decimals) coordinates."""
+    features = []
+    for feature in geojson['features']:
+        geometry = feature['geometry']
+        if geometry['type'] == 'Polygon':
+            coordinates = [_simplify_ring(r, tolerance, precision) for r in geometry['coordinates']]
+        elif geometry['type'] == 'MultiPolygon':
+            coordinates = [[_simplify_ring(r, tolerance, precision) for r in polygon]
+                           for polygon in geometry['coordinates']]
+        else:
+            coordinates = geometry['coordinates']
+        features.append({**feature, 'geometry': {**geometry, 'coordinates': coordinates}})
+    return {**geojson, 'features': features}
+
+
+def _level_path(path, level, signature):
+    return CACHE_DIR / f"{Path(path).stem}-z{level}-{signature[0]}-{signature[1]}.geojson"
+
+
+def build_levels(path):
+    """Write every simplification level of `path` to the cache directory.
+
+    Each file is written to a temp file and renamed into place, so a reader
+    (the warm-up thread builds the same levels) never sees half a GeoJSON.
+    Levels of older versions of `path` are removed.
+    """
+    with open(path) as archivo:
+        geojson = json.load(archivo)
+    signature = file_signature(path)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    targets = []
+    for level, (_, tolerance, precision) in enumerate(LEVELS):
+        target = _level_path(path, level, signature)
+        # One temp file per writer: several sessions can build the levels at once
+        tmp = target.with_name(f"{target.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        with open(tmp, 'w') as salida:
+            json.dump(simplify_geojson(geojson, tolerance, precision), salida, separators=(',', ':'))
+        os.replace(tmp, target)
+        targets.append(target)
+    stale = re.compile(rf"{re.escape(Path(path).stem)}-z\d+-\d+-\d+\.geojson")
+    for old in CACHE_DIR.glob(f"{Path(path).stem}-z*.geojson"):
+        if stale.fullmatch(old.name) and old not in targets:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+    return targets
+
+
+def enrich_features(geojson, df, key_column='Municipio', property_key='NOMGEO',
+                    columns=None, default=0):
+    """Attach columns of `df` to the properties of every GeoJSON feature.
+
+    Builds a dict lookup from `key_column` once (first row wins, as before)
+    and makes one pass over the features. Geometries are shared with the
+    input, only the feature and properties dicts are new, so the source
+    GeoJSON is left untouched without a json.dumps/json.loads deep copy.
+    """
+    if columns is None:
+        columns = [c for c in df.columns if c != key_column]
+    lookup = (df.drop_duplicates(key_column)
+              .set_index(key_column)[list(columns)]
+              .to_dict('index'))
+    missing = {col: default for col in columns}
+
+    features = []
+    for feature in geojson['features']:
+        properties = dict(feature['properties'])
+        properties.update(lookup.get(properties.get(property_key), missing))
+        features.append({**feature, 'properties': properties})
+    return {**geojson, 'features': features}
+
+
+@st.cache_resource(show_spinner=False)
+def _load_geojson(path, level, signature):
+    if level is None:
+        return dataset_for_path(path, 'geojson')
+    target = _level_path(path, level, signature)
+    if not target.exists():
+        build_levels(path)
+    with open(target) as archivo:
+        return json.load(archivo)
+
+
+def load_geojson(path, zoom=None):
+    """Parsed GeoJSON shared across reruns and sessions (treat as read-only).
+
+    With a zoom, returns the simplified level suited to it instead of the
+    full-resolution polygons.
+    """
+    level = level_for_zoom(zoom) if zoom is not None else None
+    return _load_geojson(path, level, file_signature(path))
+
+
+@st.cache_data(show_spinner=False)
+def _load_municipios(path, signature):
+    return dataset_for_path(path, 'csv')
+
+
+def load_municipios(path):
+    return _load_municipios(path, file_signature(path))
+
+
+@st.cache_resource(show_spinner=False)
+def _load_enriched_geojson(geojson_path, csv_path, columns, zoom, signatures):
+    return enrich_features(load_geojson(geojson_path, zoom), load_municipios(csv_path),
+                           columns=list(columns) if columns else None)
+
+
+def load_enriched_geojson(geojson_path, csv_path, columns=('RandomNumbers',), zoom=None):
+    """Municipality GeoJSON with the municipiosDatos.csv columns in its properties."""
+    signatures = (file_signature(geojson_path), file_signature(csv_path))
+    if zoom is not None:
+        zoom = LEVELS[level_for_zoom(zoom)][0]  # one cache entry per level
+    return _load_enriched_geojson(geojson_path, csv_path, tuple(columns or ()), zoom, signatures)
+
+
+class PreserializedLayer(PydeckType):
+    """pydeck layer serialized to JSON once and reused in every Deck spec.
+
+    Deck.to_json() would otherwise re-encode the whole polygon payload on
+    every rerun, even when only the filtered scatter points changed.
+    """
+
+    def __init__(self, layer):
+        self.id = layer.id
+        self.json = json.dumps(layer, sort_keys=True, default=default_serialize)
+
+    def __repr__(self):
+        return f"__preserialized_layer_{self.id}__"
+
+
+class Deck(pdk.Deck):
+    """pdk.Deck that splices PreserializedLayer JSON into its spec."""
+
+    def to_json(self):
+        spec = super().to_json()
+        for layer in self.layers:
+            if isinstance(layer, PreserializedLayer):
+                spec = spec.replace(json.dumps(repr(layer)), layer.json)
+        return spec
+
+
+@st.cache_resource(show_spinner=False)
+def _load_municipios_layer(geojson_path, csv_path, zoom, fill_alpha, line_alpha, opacity, signatures):
+    enriched = load_enriched_geojson(geojson_path, csv_path, columns=['RandomNumbers'], zoom=zoom)
+    layer = pdk.Layer(
+        "GeoJsonLayer",
+        enriched,
+        id='municipios',
+        filled=True,
+        get_fill_color=[
+            "(properties.RandomNumbers / 1000) * 255",  # Red component (scaled by value)
+            "(properties.RandomNumbers / 1000) * 255",  # Green component
+            "255 - (properties.RandomNumbers / 1000) * 255",  # Blue component (inverse scaled)
+            fill_alpha
+        ],
+        get_line_color=[0, 0, 0, line_alpha],
+        get_line_width=1,
+        stroked=True,
+        opacity=opacity,
+        extruded=False,
+        auto_highlight=True,
+        pickable=True
+    )
+    return PreserializedLayer(layer)
+
+
+def load_municipios_layer(geojson_path, csv_path, zoom=None, fill_alpha=200, line_alpha=200, opacity=0.8):
+    """RandomNumbers choropleth of the municipalities, built and serialized
+    once per process and shared by every session (use with geo.Deck)."""
+    signatures = (file_signature(geojson_path), file_signature(csv_path))
+    return _load_municipios_layer(geojson_path, csv_path, zoom, fill_alpha, line_alpha, opacity, signatures)
+
+
+if __name__ == '__main__':
+    # Preprocessing step: python geo.py [Yucatan.geojson]
+    source = sys.argv[1] if len(sys.argv) > 1 else 'Yucatan.geojson'
+    print(f"{source}: {os.path.getsize(source) / 1e6:.2f} MB")
+    for target in build_levels(source):
+        print(f"  {target}: {os.path.getsize(target) / 1e6:.2f} MB")
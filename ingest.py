@@ -0,0 +1,171 @@
+import hashlib
+import json
+import numbers
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from data_cache import CACHE_DIR, file_lock, file_signature, read_excel, tmp_path, write_parquet
+from sales_cube import SalesCube
+from schema import normalize_sales
+
+# Parts are merged back into one file once there are more than this many
+MAX_PARTS = 8
+# Stands for every missing cell (NaN, None, NaT, pd.NA) in the ingest digest
+NA_SENTINEL = '\x00NA'
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(directory):
+    with _locks_guard:
+        return _locks.setdefault(str(directory), threading.Lock())
+
+
+class SalesStore:
+    """Append-only columnar copy of a sales workbook plus its running cube.
+
+    refresh() re-reads the workbook (an .xlsx sheet can only be parsed
+    whole) and compares a digest of its first `rows` rows with the one of the
+    ingested rows. If they match, only the rows past that watermark are
+    written as a new Parquet part and folded into the persisted SalesCube
+    cells. If the rows before the watermark changed (edits, deletions,
+    re-sorting) the store is rebuilt.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        digest = hashlib.sha1(str(Path(source).resolve()).encode('utf-8')).hexdigest()[:10]
+        self.directory = CACHE_DIR / 'ingest' / f"{Path(source).stem}-{digest}"
+        self.lock = _lock_for(self.directory)
+
+    # --- persisted state -------------------------------------------------
+    def _state_path(self):
+        return self.directory / 'state.json'
+
+    def _cells_path(self):
+        return self.directory / 'cells.parquet'
+
+    def _load_state(self):
+        try:
+            with open(self._state_path()) as archivo:
+                return json.load(archivo)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'rows': 0, 'digest': None, 'parts': [], 'signature': None}
+
+    def _save_state(self, state):
+        tmp = tmp_path(self._state_path())
+        with open(tmp, 'w') as archivo:
+            json.dump(state, archivo)
+        os.replace(tmp, self._state_path())
+
+    def _reset(self):
+        for old in self.directory.glob('*.parquet'):
+            old.unlink()
+        return {'rows': 0, 'digest': None, 'parts': [], 'signature': None}
+
+    # --- ingestion -------------------------------------------------------
+    @staticmethod
+    def _cell_text(col):
+        # Numbers as float text, everything else as str, every NA as one sentinel
+        if pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col):
+            text = col.astype('float64').astype(str)
+        elif col.dtype == object:
+            # Mixed column: numbers must hash as they would in a numeric column
+            text = col.map(lambda v: str(float(v)) if isinstance(v, numbers.Real) and not isinstance(v, bool)
+                           else str(v))
+        else:
+            text = col.astype(str)
+        return text.mask(col.isna(), NA_SENTINEL)
+
+    @classmethod
+    def _digest(cls, rows):
+        # Hash of every cell, independent of the dtype inferred for the read:
+        # a column can turn from int to float when later rows have blanks, or
+        # from float (all empty) to str once later rows fill it
+        normalized = pd.DataFrame({col: cls._cell_text(rows[col]) for col in rows.columns})
+        hashed = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+        return hashlib.sha1('|'.join(rows.columns).encode('utf-8') + hashed.tobytes()).hexdigest()
+
+    def _align(self, new, parts):
+        # Keep the dtypes of the stored parts (e.g. an all-empty column in the new rows)
+        if not parts:
+            return new
+        schema = pq.read_schema(self.directory / parts[0]).empty_table().to_pandas().dtypes
+        for col, dtype in schema.items():
+            if col in new.columns and new[col].dtype != dtype:
+                try:
+                    new[col] = new[col].astype(dtype)
+                except (TypeError, ValueError):
+                    pass
+        return new
+
+    def refresh(self):
+        """Ingest rows added since the last refresh; returns how many."""
+        # The thread lock keeps sessions of this process in line, the file
+        # lock other processes writing the same store (replicas, prebuild)
+        with self.lock, file_lock(self.directory / 'refresh.lock'):
+            state = self._load_state()
+            signature = list(file_signature(self.source))
+            if state['signature'] == signature and self._cells_path().exists():
+                return 0
+
+            current = read_excel(self.source)
+            if state['rows'] > 0 and (len(current) < state['rows']
+                                      or self._digest(current.iloc[:state['rows']]) != state['digest']):
+                state = self._reset()
+            new = current.iloc[state['rows']:].reset_index(drop=True)
+
+            if len(new):
+                part = f"part-{len(state['parts']):05d}-{state['rows']}.parquet"
+                write_parquet(self._align(new, state['parts']), self.directory / part)
+                state['parts'].append(part)
+                if self._cells_path().exists():
+                    cube = SalesCube.from_cells(pd.read_parquet(self._cells_path())).update(new)
+                else:
+                    cube = SalesCube(new)
+                write_parquet(cube.cells, self._cells_path())
+                state['rows'] += len(new)
+                state['digest'] = self._digest(current.iloc[:state['rows']])
+            elif not self._cells_path().exists():
+                write_parquet(SalesCube(new).cells, self._cells_path())
+
+            if len(state['parts']) > MAX_PARTS:
+                state['parts'] = self._compact(state['parts'])
+            state['signature'] = signature
+            self._save_state(state)
+            return len(new)
+
+    def _compact(self, parts):
+        merged = pd.concat([pd.read_parquet(self.directory / p) for p in parts], ignore_index=True)
+        target = f"part-00000-compact-{len(merged)}.parquet"
+        write_parquet(merged, self.directory / target)
+        for p in parts:
+            if p != target:
+                (self.directory / p).unlink(missing_ok=True)
+        return [target]
+
+    # --- reading ---------------------------------------------------------
+    def frame(self, columns=None):
+        """All ingested rows, in workbook order; `columns` projects the Parquet read."""
+        parts = self._load_state()['parts']
+        if not parts:
+            return pd.DataFrame(columns=columns)
+        return pd.concat([pd.read_parquet(self.directory / p, columns=columns) for p in parts],
+                         ignore_index=True)
+
+    def cube(self):
+        """The running SalesCube, without touching the order rows."""
+        return SalesCube.from_cells(pd.read_parquet(self._cells_path()))
+
+
+def read_sales(path, columns=None):
+    """Sales workbook through its incremental store (used by the registry),
+    with the compact dtypes of schema.normalize_sales."""
+    store = SalesStore(path)
+    store.refresh()
+    return normalize_sales(store.frame(columns))
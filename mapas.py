@@ -1,61 +1,39 @@
-import json 
-import pandas as pd
 import pydeck as pdk
 import streamlit  as st
 
-import pydeck as pdk
-
-municipios_yucatan = "Yucatan.geojson"
-with open(municipios_yucatan) as archivo:
-    municipios_json = json.load(archivo)
-dfMunicipios = pd.read_csv("municipiosDatos.csv")
-dfMunicipios.drop('Unnamed: 0',axis=1,inplace=True)
-st.dataframe(dfMunicipios)
+from geo import Deck, load_municipios, load_municipios_layer
+import profiling
+from registry import warm_up
 
-# Create a copy of the GeoJSON data to modify it
-enriched_municipios_json = json.loads(json.dumps(municipios_json))
+# Precarga en segundo plano de todos los datos del servidor (una vez por proceso)
+warm_up()
+# Tiempos por etapa de esta ejecución (panel opcional en la barra lateral y log)
+profiling.start('mapas')
 
-# Merge RandomNumbers from dfMunicipios into the GeoJSON properties
-for feature in enriched_municipios_json['features']:
-    municipio_name = feature['properties']['NOMGEO']
-    # Find the corresponding row in dfMunicipios
-    matching_row = dfMunicipios[dfMunicipios['Municipio'] == municipio_name]
-    if not matching_row.empty:
-        # Convert numpy.int64 to a standard Python int
-        random_number = int(matching_row['RandomNumbers'].iloc[0])
-        feature['properties']['RandomNumbers'] = random_number
-    else:
-        feature['properties']['RandomNumbers'] = 0 # Default value if no match found
-# Define the pydeck GeoJsonLayer
-geojson_layer = pdk.Layer(
-    "GeoJsonLayer",
-    enriched_municipios_json,
-    filled=True,
-    get_fill_color=[
-        "(properties.RandomNumbers / 1000) * 255", # Red component (scaled by value)
-        "(properties.RandomNumbers / 1000) * 255", # Green component
-        "255 - (properties.RandomNumbers / 1000) * 255", # Blue component (inverse scaled)
-        200 # Alpha transparency
-    ],
-    get_line_color=[0, 0, 0, 200],
-    get_line_width=1,
-    stroked=True,
-    opacity=0.8,
-    extruded=False,
-    auto_highlight=True,
-    pickable=True # Make polygons pickable for interactivity
-)
+municipios_yucatan = "Yucatan.geojson"
+initial_zoom = 7
+with profiling.stage('load') as etapa:
+    dfMunicipios = load_municipios("municipiosDatos.csv")
+    etapa.rows_out = len(dfMunicipios)
+with profiling.stage('table', rows_in=len(dfMunicipios)):
+    st.dataframe(dfMunicipios)
+
+# GeoJsonLayer with RandomNumbers merged into the municipality properties (0 if no match found),
+# simplified for the initial zoom level and built/serialized once per process
+with profiling.stage('layer'):
+    geojson_layer = load_municipios_layer(municipios_yucatan, "municipiosDatos.csv", zoom=initial_zoom,
+                                          fill_alpha=200, line_alpha=200, opacity=0.8)
 
 # Set the initial view state for Yucatan
 view_state = pdk.ViewState(
     latitude=20.8,
     longitude=-89.0,
-    zoom=7,
+    zoom=initial_zoom,
     pitch=0
 )
 
 # Create the pydeck Deck
-r = pdk.Deck(
+r = Deck(
     layers=[geojson_layer],
     initial_view_state=view_state,
     tooltip={"text": "Municipio: {NOMGEO}\nRandomNumbers: {RandomNumbers}"}
@@ -63,6 +41,7 @@ r = pdk.Deck(
 
 # Render the deck
 
-st.pydeck_chart(r)
-
+with profiling.stage('charts'):
+    st.pydeck_chart(r)
 
+profiling.finish()
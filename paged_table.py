@@ -0,0 +1,80 @@
+import io
+
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZES = [25, 50, 100, 500]
+
+
+def iter_csv_chunks(df, chunk_rows=50_000):
+    """CSV export of `df` as a sequence of encoded chunks (header in the first)."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=False, header=start == 0).encode('utf-8')
+
+
+def _csv_export(df):
+    def build():
+        # Only runs when the download button is clicked
+        buffer = io.BytesIO()
+        for chunk in iter_csv_chunks(df):
+            buffer.write(chunk)
+        buffer.seek(0)
+        return buffer
+    return build
+
+
+def page_window(df, page, page_size, sort_column=None, ascending=True):
+    """Rows of `page` (1-based) after sorting by `sort_column`.
+
+    Numeric and date columns use a partial selection (nsmallest/nlargest of
+    the rows up to the end of the page) instead of sorting the whole frame.
+    """
+    start = (page - 1) * page_size
+    end = start + page_size
+    if sort_column is None:
+        return df.iloc[start:end]
+    column = df[sort_column]
+    if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_datetime64_any_dtype(column):
+        if column.isna().any():
+            return df.sort_values(sort_column, ascending=ascending, kind='stable').iloc[start:end]
+        pick = df.nsmallest if ascending else df.nlargest
+        return pick(end, sort_column, keep='first').iloc[start:end]
+    return df.sort_values(sort_column, ascending=ascending, kind='stable').iloc[start:end]
+
+
+def paged_dataframe(df, key, page_sizes=PAGE_SIZES, file_name='resultado.csv'):
+    """st.dataframe replacement that only serializes the visible page.
+
+    Page size, sort column/direction and page number live in session state
+    under `key`, and the full result is exported on demand as CSV.
+    """
+    col_sort, col_order, col_size, col_page = st.columns([3, 2, 2, 2])
+    with col_sort:
+        sort_column = st.selectbox('Ordenar por', [None] + list(df.columns),
+                                   format_func=lambda c: '—' if c is None else str(c),
+                                   key=f'{key}_sort')
+    with col_order:
+        ascending = st.radio('Orden', ['Asc', 'Desc'], horizontal=True,
+                             key=f'{key}_order') == 'Asc'
+    with col_size:
+        page_size = st.selectbox('Filas por página', page_sizes, index=min(1, len(page_sizes) - 1),
+                                 key=f'{key}_page_size')
+    n_pages = max(1, -(-len(df) // page_size))
+    # Keep the page in range when a filter shrinks the result
+    if st.session_state.get(f'{key}_page', 1) > n_pages:
+        st.session_state[f'{key}_page'] = n_pages
+    with col_page:
+        page = st.number_input('Página', min_value=1, max_value=n_pages, step=1,
+                               key=f'{key}_page')
+
+    window = page_window(df, int(page), page_size, sort_column, ascending)
+    st.dataframe(window)
+    first = (int(page) - 1) * page_size
+    st.caption(f'Filas {first + 1 if len(window) else 0:,}–{first + len(window):,} '
+               f'de {len(df):,} (página {int(page)} de {n_pages})')
+
+    st.download_button('Descargar resultado completo (CSV)', data=_csv_export(df),
+                       file_name=file_name, mime='text/csv', key=f'{key}_download',
+                       on_click='ignore')
+    return window
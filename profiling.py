@@ -0,0 +1,186 @@
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from data_cache import CACHE_DIR
+
+# One JSON object per rerun is appended here. Past PROFILE_LOG_BYTES the file
+# is rotated to stages.jsonl.1 ... .N, so the log never takes more than
+# (PROFILE_LOG_BACKUPS + 1) x that size
+PROFILE_LOG = Path(os.environ.get('DASHBOARD_PROFILE_LOG', CACHE_DIR / 'logs' / 'stages.jsonl'))
+PROFILE_LOG_BYTES = int(float(os.environ.get('DASHBOARD_PROFILE_LOG_MB', 10)) * 1024 * 1024)
+PROFILE_LOG_BACKUPS = 3
+
+_logger = logging.getLogger('dashboard.stages')
+_logger.propagate = False
+# Attribute of the session's ScriptRunContext holding the RerunProfile of the
+# run in progress. Each start() replaces it, so a run stopped before finish()
+# (rerun, st.stop()) leaves nothing behind once the session goes away
+_PROFILE_ATTR = '_dashboard_profile'
+
+
+class StageRecord:
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.seconds = 0.0
+        self.bytes = 0
+
+    def as_dict(self):
+        return {'stage': self.name, 'seconds': round(self.seconds, 6), 'rows_in': self.rows_in,
+                'rows_out': self.rows_out, 'bytes': self.bytes}
+
+
+class RerunProfile:
+    """Wall time, rows in/out and bytes sent to the browser per stage of one script run.
+
+    Bytes are the serialized size of the messages Streamlit queues for the
+    frontend while the stage is open (charts, tables, widgets...).
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.started = time.perf_counter()
+        self.stages = []
+        self._open = []
+        self.bytes_total = 0
+
+    def _sent(self, size):
+        self.bytes_total += size
+        for record in self._open:
+            record.bytes += size
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        record = StageRecord(name, rows_in)
+        self.stages.append(record)
+        self._open.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            self._open.remove(record)
+
+    def summary(self):
+        return {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'script': self.script,
+            'seconds': round(time.perf_counter() - self.started, 6),
+            'bytes': self.bytes_total,
+            'stages': [record.as_dict() for record in self.stages],
+        }
+
+
+def _rows(value):
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+
+def _hook(ctx):
+    # Count the bytes of every message this session sends, once per context.
+    # Relies on Streamlit internals: ScriptRunContext._enqueue is private and
+    # may change between versions (start() then runs without byte counts)
+    if getattr(ctx, '_profiling_hooked', False):
+        return
+    enqueue = ctx._enqueue
+
+    def counting_enqueue(msg):
+        profile = getattr(ctx, _PROFILE_ATTR, None)
+        if profile is not None:
+            profile._sent(msg.ByteSize())
+        enqueue(msg)
+
+    ctx._enqueue = counting_enqueue
+    ctx._profiling_hooked = True
+
+
+def start(script):
+    """Begin profiling the current script run; call at the top of the dashboard."""
+    profile = RerunProfile(script)
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        try:
+            _hook(ctx)
+        except AttributeError:
+            pass  # another Streamlit version: no byte counts
+        setattr(ctx, _PROFILE_ATTR, profile)
+    return profile
+
+
+def current():
+    """Profile of the running script, or a detached one outside Streamlit/start()."""
+    ctx = get_script_run_ctx()
+    profile = getattr(ctx, _PROFILE_ATTR, None) if ctx is not None else None
+    return profile if profile is not None else RerunProfile(None)
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """Time a block as a stage of the current run; set `.rows_out` on the record."""
+    with current().stage(name, rows_in=rows_in) as record:
+        yield record
+
+
+def profiled(name):
+    """Decorator: time each call as a stage, rows from the first argument and the result."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name, rows_in=_rows(args[0]) if args else None) as record:
+                result = func(*args, **kwargs)
+                record.rows_out = _rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def _log(summary):
+    if not _logger.handlers:
+        try:
+            PROFILE_LOG.parent.mkdir(parents=True, exist_ok=True)
+            _logger.addHandler(RotatingFileHandler(PROFILE_LOG, maxBytes=PROFILE_LOG_BYTES,
+                                                   backupCount=PROFILE_LOG_BACKUPS, encoding='utf-8'))
+            _logger.setLevel(logging.INFO)
+        except OSError:
+            _logger.addHandler(logging.NullHandler())
+    _logger.info(json.dumps(summary, ensure_ascii=False))
+
+
+def finish(panel=True, extra=None):
+    """End the run: append it to PROFILE_LOG and, if enabled, show the debug panel.
+
+    Call at the bottom of the dashboard. The panel is an optional sidebar
+    toggle ('Mostrar tiempos'), off by default. `extra` (e.g. cache counters)
+    is logged with the run and shown under the stage table.
+    """
+    ctx = get_script_run_ctx()
+    profile = getattr(ctx, _PROFILE_ATTR, None) if ctx is not None else None
+    if profile is None:
+        return None
+    setattr(ctx, _PROFILE_ATTR, None)
+    summary = profile.summary()
+    if extra:
+        summary.update(extra)
+    _log(summary)
+    if panel and st.sidebar.toggle('Mostrar tiempos', value=False, key='_profiling_panel'):
+        with st.sidebar.expander('Tiempos de esta ejecución', expanded=True):
+            st.caption(f"{summary['seconds'] * 1000:,.0f} ms · {summary['bytes'] / 1024:,.1f} KB al navegador")
+            table = pd.DataFrame(summary['stages'], columns=['stage', 'seconds', 'rows_in', 'rows_out', 'bytes'])
+            table['ms'] = table.pop('seconds') * 1000
+            table[['rows_in', 'rows_out']] = table[['rows_in', 'rows_out']].astype('Int64')
+            st.dataframe(table, hide_index=True)
+            for name, value in (extra or {}).items():
+                st.caption(name)
+                st.json(value, expanded=False)
+    return summary
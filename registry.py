@@ -0,0 +1,171 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+from data_cache import file_signature, read_excel_cached
+from flights import read_flights
+from ingest import read_sales
+
+# Every data source used by the dashboards: name -> (path, kind)
+DATASETS = {
+    'ventas': ('SalidaFinal.xlsx', 'sales'),
+    'ventas_detalle': ('datos/SalidaVentas.xlsx', 'sales'),
+    # Output of `python cleaning.py visitas <exportes crudos>`
+    'limpieza': ('datos/resultadoLimpieza.xlsx', 'excel'),
+    'vuelos': ('datos/lax_to_jfk.csv', 'flights'),
+    'municipios_geojson': ('Yucatan.geojson', 'geojson'),
+    'municipios': ('municipiosDatos.csv', 'csv'),
+}
+# Read on demand only: the dashboards use streaming aggregates of these instead
+LAZY_DATASETS = {'vuelos'}
+
+
+def _read_csv(path, columns=None):
+    df = pd.read_csv(path, usecols=columns)
+    return df.drop(columns='Unnamed: 0', errors='ignore')
+
+
+def _read_geojson(path, columns=None):
+    with open(path) as archivo:
+        return json.load(archivo)
+
+
+def _read_flights(path, columns=None):
+    return read_flights(path, usecols=columns)
+
+
+_READERS = {
+    'excel': read_excel_cached,
+    'csv': _read_csv,
+    'geojson': _read_geojson,
+    'flights': _read_flights,
+    'sales': read_sales,
+}
+
+
+@st.cache_resource(show_spinner=False)
+def _get_dataset(name, signature, columns):
+    path, kind = DATASETS[name]
+    return _READERS[kind](path, columns=list(columns) if columns is not None else None)
+
+
+def get_dataset(name, columns=None):
+    """Shared, process-wide copy of a registered dataset.
+
+    The same object is handed to every session: treat it as read-only and
+    copy before adding or modifying columns. `columns` loads only that
+    projection (its own shared copy), for dashboards that need a few columns.
+    """
+    path, _ = DATASETS[name]
+    columns = tuple(columns) if columns is not None else None
+    return _get_dataset(name, file_signature(path), columns)
+
+
+def dataset_for_path(path, kind=None, columns=None):
+    """get_dataset() for a registered path; unregistered paths are read directly."""
+    for name, (registered, registered_kind) in DATASETS.items():
+        if registered == path and kind in (None, registered_kind):
+            return get_dataset(name, columns=columns)
+    return _READERS[kind or 'excel'](path, columns=columns)
+
+
+def _prebuild(name):
+    # Runs in a worker process: fills the on-disk caches, returns nothing heavy.
+    # Those writes hold file locks (data_cache.file_lock), so prebuilds of
+    # other processes on the same .cache wait instead of colliding
+    path, kind = DATASETS[name]
+    _READERS[kind](path)
+    return name
+
+
+def _prebuild_subprocess(name):
+    # A fresh interpreter per workbook: unlike a multiprocessing pool it does
+    # not re-import the caller's __main__ (Streamlit script, test runner...)
+    here = os.path.dirname(os.path.abspath(__file__))
+    # Prepended: the caller's PYTHONPATH (venvs, editable installs) still applies
+    pythonpath = os.pathsep.join(filter(None, [here, os.environ.get('PYTHONPATH')]))
+    result = subprocess.run([sys.executable, '-c', f'import registry; registry._prebuild({name!r})'],
+                            cwd=os.getcwd(), env={**os.environ, 'PYTHONPATH': pythonpath},
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"{name}: {(result.stderr.strip().splitlines() or [''])[-1]}")
+    return name
+
+
+def prebuild_workbooks(max_workers=None):
+    """Parse every workbook dataset into its Parquet cache, one process each.
+
+    Safe to run while a deploy step or another replica warms the same cache:
+    each workbook is parsed by whichever process takes its lock first.
+    """
+    names = [name for name, (_, kind) in DATASETS.items() if kind in ('excel', 'sales')]
+    workers = min(len(names), max_workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_prebuild_subprocess, names))
+
+
+def _warm_derived():
+    # Imported here: these modules load their data through the registry
+    from filter_index import load_filter_index
+    from flights_agg import load_flight_aggregates
+    from geo import LEVELS, load_municipios_layer
+    from sales_cube import load_cube
+
+    for name in ('ventas', 'ventas_detalle'):
+        load_cube(DATASETS[name][0])
+        load_filter_index(DATASETS[name][0])
+    load_flight_aggregates(DATASETS['vuelos'][0])
+    for min_zoom, _, _ in LEVELS:
+        load_municipios_layer(DATASETS['municipios_geojson'][0], DATASETS['municipios'][0], zoom=min_zoom)
+
+
+def warm_all():
+    """Load every dataset and the structures derived from them; returns timings."""
+    timings = {}
+    start = time.perf_counter()
+    try:
+        prebuild_workbooks()
+    except Exception as e:
+        print(f"No se pudieron preparar los libros en paralelo: {e}")
+    timings['workbooks'] = time.perf_counter() - start
+    for name in DATASETS:
+        if name in LAZY_DATASETS:
+            continue
+        start = time.perf_counter()
+        try:
+            get_dataset(name)
+        except Exception as e:
+            print(f"No se pudo precargar '{name}': {e}")
+        timings[name] = time.perf_counter() - start
+    start = time.perf_counter()
+    try:
+        _warm_derived()
+    except Exception as e:
+        print(f"No se pudieron precargar los agregados: {e}")
+    timings['derived'] = time.perf_counter() - start
+    return timings
+
+
+@st.cache_resource(show_spinner=False)
+def warm_up():
+    """Start warming every dataset in a background thread, once per process.
+
+    Called at the top of each dashboard: the first script run after a deploy
+    starts the thread, so the other pages are already loaded when visited.
+    """
+    thread = threading.Thread(target=warm_all, name='dataset-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == '__main__':
+    # Build the on-disk caches ahead of time, e.g. as a deploy step
+    for name, seconds in warm_all().items():
+        print(f"{name}: {seconds:.2f} s")
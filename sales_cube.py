@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_cache import file_signature
+
+DIMENSIONS = ['Region', 'State', 'Category', 'Sub-Category', 'Order Date']
+MEASURES = ['Sales', 'Profit', 'Quantity']
+
+
+class SalesCube:
+    """Pre-aggregated Sales/Profit/Quantity over the Region x State x
+    Category x Sub-Category x Order-Date (day) grid.
+
+    Charts roll the cells up with query() instead of scanning the order rows,
+    so their cost depends on the number of distinct cells, not on history.
+    """
+
+    def __init__(self, df):
+        self.cells = self._finish(self._aggregate(df))
+
+    @staticmethod
+    def _aggregate(data):
+        data = data[DIMENSIONS + MEASURES].copy()
+        data['Order Date'] = pd.to_datetime(data['Order Date']).dt.normalize()
+        return (data.groupby(DIMENSIONS, observed=True, sort=False)[MEASURES]
+                .sum()
+                .reset_index())
+
+    @staticmethod
+    def _finish(cells):
+        cells = cells[DIMENSIONS + MEASURES].copy()
+        for col in DIMENSIONS[:-1]:
+            cells[col] = cells[col].astype('category')
+        # Derived level so the yearly charts don't need to touch the dates
+        cells['Year'] = cells['Order Date'].dt.year.astype('int16')
+        return cells
+
+    @classmethod
+    def from_cells(cls, cells):
+        """Rebuild a cube from previously stored cells (see ingest.py)."""
+        cube = cls.__new__(cls)
+        cube.cells = cls._finish(cells)
+        return cube
+
+    def update(self, df):
+        """Fold new order rows into the cells.
+
+        Only the new rows are aggregated. Their cells are added to the
+        matching existing cells by key and the unseen ones are appended, so
+        the order history is never re-aggregated.
+        """
+        if len(df):
+            cells = self.cells.set_index(DIMENSIONS)[MEASURES]
+            new = self._aggregate(df).set_index(DIMENSIONS)
+            positions = cells.index.get_indexer(new.index)
+            known = positions >= 0
+            added = {}
+            for col in MEASURES:
+                # Integer measures (Quantity) stay integers
+                integer = all(pd.api.types.is_integer_dtype(d) for d in (cells[col].dtype, new[col].dtype))
+                dtype = 'int64' if integer else 'float64'
+                values = cells[col].to_numpy(dtype=dtype, copy=True)
+                np.add.at(values, positions[known], new[col].to_numpy(dtype=dtype)[known])
+                added[col] = values
+            cells = cells.assign(**added).reset_index()
+            unseen = new[~known].reset_index()
+            self.cells = self._finish(pd.concat([cells.astype({c: object for c in DIMENSIONS[:-1]}), unseen],
+                                                ignore_index=True))
+        return self
+
+    def _select(self, regions=None, states=None, categories=None, start_date=None, end_date=None):
+        cells = self.cells
+        mask = pd.Series(True, index=cells.index)
+        if regions is not None:
+            mask &= cells['Region'].isin(regions)
+        if states is not None:
+            mask &= cells['State'].isin(states)
+        if categories is not None:
+            mask &= cells['Category'].isin(categories)
+        if start_date is not None:
+            mask &= cells['Order Date'] >= pd.to_datetime(start_date)
+        if end_date is not None:
+            mask &= cells['Order Date'] <= pd.to_datetime(end_date)
+        return cells[mask]
+
+    def query(self, by, measures=None, **filters):
+        """Roll the cube up to the `by` levels (any of DIMENSIONS or 'Year').
+
+        Filters: regions, states, categories (lists) and start_date/end_date
+        (inclusive). Returns a flat DataFrame like groupby(...).sum().reset_index().
+        """
+        measures = list(measures or MEASURES)
+        cells = self._select(**filters)
+        return (cells.groupby(list(by), observed=True)[measures]
+                .sum()
+                .reset_index())
+
+    def totals(self, measures=None, **filters):
+        """Grand totals for the filtered selection as a Series."""
+        measures = list(measures or MEASURES)
+        return self._select(**filters)[measures].sum()
+
+
+@st.cache_resource(show_spinner=False)
+def _load_cube(file_path, signature):
+    # Imported here: ingest builds on SalesCube
+    from ingest import SalesStore
+
+    store = SalesStore(file_path)
+    store.refresh()
+    return store.cube()
+
+
+def load_cube(file_path):
+    """Cube for the current workbook version, shared across sessions.
+
+    Kept up to date incrementally by ingest.SalesStore: a new version of the
+    workbook only aggregates the rows appended since the last refresh.
+    """
+    return _load_cube(file_path, file_signature(file_path))
@@ -0,0 +1,105 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Superstore-style text columns that are always stored as categories
+SALES_CATEGORIES = ['Region', 'State', 'City', 'Country', 'Category', 'Sub-Category', 'Segment',
+                    'Ship Mode', 'Product Name', 'Return Reason', 'es devolución?', 'Aprobador']
+SALES_DATES = ['Order Date', 'Ship Date']
+# State name -> USPS code, for Plotly's locationmode='USA-states'
+STATE_ABBREVIATIONS = {
+    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
+    'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'District of Columbia': 'DC',
+    'Florida': 'FL', 'Georgia': 'GA', 'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL',
+    'Indiana': 'IN', 'Iowa': 'IA', 'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA',
+    'Maine': 'ME', 'Maryland': 'MD', 'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN',
+    'Mississippi': 'MS', 'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV',
+    'New Hampshire': 'NH', 'New Jersey': 'NJ', 'New Mexico': 'NM', 'New York': 'NY',
+    'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK', 'Oregon': 'OR',
+    'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC', 'South Dakota': 'SD',
+    'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT', 'Virginia': 'VA',
+    'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY'
+}
+# Other text columns become categories below this distinct/rows ratio
+CATEGORY_RATIO = 0.5
+
+
+def _downcast_numeric(series):
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series):
+        values = series.dropna()
+        # Whole numbers with gaps (e.g. Postal Code) fit a nullable integer
+        if len(values) and (values == np.floor(values)).all():
+            low, high = values.min(), values.max()
+            for dtype in ('Int8', 'Int16', 'Int32', 'Int64'):
+                info = np.iinfo(dtype.lower())
+                if info.min <= low and high <= info.max:
+                    return series.astype(dtype)
+        # float32 only when no value changes, money columns stay float64
+        as_float32 = series.astype('float32')
+        if as_float32.astype('float64').equals(series):
+            return as_float32
+    return series
+
+
+def normalize(df, categories=(), dates=(), category_ratio=CATEGORY_RATIO):
+    """Memory-compact copy of df.
+
+    Integers are downcast, floats narrowed only when lossless, `dates` parsed
+    to datetime64, `categories` and other low-cardinality text columns
+    converted to category.
+    """
+    out = df.copy()
+    for col in out.columns:
+        series = out[col]
+        if col in dates:
+            out[col] = pd.to_datetime(series)
+        elif col in categories:
+            out[col] = series.astype('category')
+        elif pd.api.types.is_numeric_dtype(series):
+            out[col] = _downcast_numeric(series)
+        elif pd.api.types.is_string_dtype(series) or series.dtype == object:
+            if len(series) and series.nunique() / len(series) < category_ratio:
+                out[col] = series.astype('category')
+    return out
+
+
+def normalize_sales(df):
+    """normalize() with the Superstore column conventions."""
+    return normalize(df, categories=[c for c in SALES_CATEGORIES if c in df.columns],
+                     dates=[c for c in SALES_DATES if c in df.columns])
+
+
+def memory_footprint(df):
+    """Deep memory usage per column, in bytes."""
+    return df.memory_usage(deep=True, index=False)
+
+
+def footprint_report(before, after):
+    """Per-column dtype and memory before/after, plus a TOTAL row."""
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'bytes_before': memory_footprint(before),
+        'dtype_after': after.dtypes.reindex(before.columns).astype(str),
+        'bytes_after': memory_footprint(after).reindex(before.columns),
+    })
+    report.loc['TOTAL'] = ['', report['bytes_before'].sum(), '', report['bytes_after'].sum()]
+    report['ratio'] = report['bytes_after'] / report['bytes_before']
+    return report
+
+
+if __name__ == '__main__':
+    # python schema.py [workbook ...]
+    from data_cache import read_excel_cached
+
+    for path in sys.argv[1:] or ['SalidaFinal.xlsx', 'datos/SalidaVentas.xlsx']:
+        raw = read_excel_cached(path)
+        report = footprint_report(raw, normalize_sales(raw))
+        total = report.loc['TOTAL']
+        print(f"{path}: {total['bytes_before'] / 1e6:.2f} MB -> {total['bytes_after'] / 1e6:.2f} MB "
+              f"({total['ratio']:.0%})")
+        print(report.to_string())
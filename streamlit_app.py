@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+import charts
+
 #Título
 st.title("Mi primer app de streamlit editada")
 
@@ -77,7 +79,8 @@ df = get_data()
 
 st.dataframe(df.head())
 
-st.map(df)
+# Con muchos listados los puntos se agrupan en una rejilla (WebGL, deck.gl)
+st.pydeck_chart(charts.point_map(df[['latitude', 'longitude']]))
 
 values = st.sidebar.slider("Price range", float(df.price.min()), 1000.0,
                            (50.0, 300.0))
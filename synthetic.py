@@ -0,0 +1,427 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Rows generated (and written) at a time, so tens of millions fit in memory
+CHUNK_ROWS = 1_000_000
+# Largest sheet Excel can hold (one header row)
+EXCEL_MAX_ROWS = 1_048_575
+
+# --- Superstore-style sales --------------------------------------------------
+REGIONS = {
+    'Central': ['Texas', 'Wisconsin', 'Nebraska', 'Illinois', 'Minnesota', 'Michigan', 'Indiana', 'Iowa',
+                'Missouri', 'Oklahoma', 'Kansas', 'South Dakota', 'North Dakota'],
+    'East': ['Pennsylvania', 'Ohio', 'New York', 'Massachusetts', 'New Jersey', 'Delaware', 'Connecticut',
+             'Rhode Island', 'New Hampshire', 'Maryland', 'West Virginia', 'District of Columbia', 'Vermont', 'Maine'],
+    'South': ['Louisiana', 'North Carolina', 'Florida', 'Mississippi', 'Virginia', 'Arkansas', 'Georgia',
+              'Alabama', 'South Carolina', 'Tennessee', 'Kentucky'],
+    'West': ['Arizona', 'California', 'Colorado', 'Idaho', 'Montana', 'Nevada', 'New Mexico', 'Oregon', 'Utah',
+             'Washington', 'Wyoming'],
+}
+# Relative order volume; states not listed weigh 1
+STATE_WEIGHTS = {'California': 20, 'New York': 11, 'Texas': 10, 'Pennsylvania': 6, 'Washington': 5,
+                 'Illinois': 5, 'Ohio': 4.5, 'Florida': 3.8, 'Michigan': 2.5, 'North Carolina': 2.5}
+CITY_NAMES = ['Springfield', 'Franklin', 'Greenville', 'Clinton', 'Fairview', 'Salem', 'Madison', 'Georgetown',
+              'Arlington', 'Ashland', 'Burlington', 'Manchester', 'Jackson', 'Newport', 'Auburn', 'Dayton',
+              'Lexington', 'Milford', 'Riverside', 'Bristol']
+# Sub-category -> (category, weight, median unit price, margin)
+SUB_CATEGORIES = {
+    'Binders': ('Office Supplies', 15, 18, 0.34), 'Paper': ('Office Supplies', 14, 16, 0.45),
+    'Furnishings': ('Furniture', 10, 35, 0.25), 'Phones': ('Technology', 9, 170, 0.2),
+    'Storage': ('Office Supplies', 8, 75, 0.15), 'Art': ('Office Supplies', 8, 9, 0.3),
+    'Accessories': ('Technology', 8, 70, 0.25), 'Chairs': ('Furniture', 6, 190, 0.1),
+    'Appliances': ('Office Supplies', 5, 110, 0.2), 'Labels': ('Office Supplies', 4, 9, 0.44),
+    'Tables': ('Furniture', 3, 300, -0.05), 'Envelopes': ('Office Supplies', 2.5, 20, 0.42),
+    'Bookcases': ('Furniture', 2.3, 200, -0.03), 'Fasteners': ('Office Supplies', 2.2, 5, 0.3),
+    'Supplies': ('Office Supplies', 2, 30, 0.05), 'Machines': ('Technology', 1.2, 400, 0.1),
+    'Copiers': ('Technology', 0.7, 700, 0.37),
+}
+BRANDS = ['Acme', 'Avery', 'Fellowes', 'Hon', 'Logitech', 'Samsung', 'Xerox', 'Eldon', 'Wilson Jones',
+          'Global', 'Bretford', 'Cisco', 'Hewlett-Packard', 'Staples', 'Sanford', 'Tenex']
+FIRST_NAMES = ['Alan', 'Beth', 'Carl', 'Diana', 'Emily', 'Frank', 'Grace', 'Henry', 'Irene', 'Jim', 'Karen',
+               'Luis', 'Maria', 'Nick', 'Olivia', 'Paul', 'Rosa', 'Sean', 'Tina', 'Victor']
+LAST_NAMES = ['Anderson', 'Brooks', 'Chen', 'Diaz', 'Evans', 'Foster', 'Garcia', 'Hughes', 'Ito', 'Jones',
+              'Kelly', 'Lopez', 'Mitchum', 'Nolan', 'Ortiz', 'Price', 'Reyes', 'Smith', 'Turner', 'Wong']
+SEGMENTS = (['Consumer', 'Corporate', 'Home Office'], [0.53, 0.30, 0.17])
+# Ship mode -> (probability, fewest days, most days)
+SHIP_MODES = {'Standard Class': (0.59, 3, 7), 'Second Class': (0.19, 1, 5),
+              'First Class': (0.157, 1, 4), 'Same Day': (0.063, 0, 1)}
+QUANTITIES = ([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14],
+              [0.088, 0.234, 0.241, 0.119, 0.128, 0.059, 0.058, 0.026, 0.028, 0.006, 0.003, 0.004, 0.003, 0.003])
+DISCOUNTS = ([0.0, 0.2, 0.7, 0.8, 0.3, 0.4, 0.15, 0.6, 0.5, 0.1, np.nan],
+             [0.44, 0.394, 0.039, 0.018, 0.014, 0.013, 0.009, 0.008, 0.006, 0.008, 0.051])
+RETURN_REASONS = ['Incorrect Product Ordered', 'No Longer Needed', 'Defective', 'General',
+                  'Incorrect Product Shipped', 'Product Listed Incorrectly']
+RETURN_SHARE = 0.038
+APPROVERS = ['L Jenkins', 'F Azad', 'C Arnold', 'M Gomez', 'S Kelly', 'R Chen', 'E Williams', 'K Lawrence']
+RETURN_NOTES = ["Customer didn't realize item was in cart.", 'customer ordered too many',
+                'This item was never shipped. Did not arrive with order', 'customer got item cheaper elsewhere']
+SALES_COLUMNS = ['Tiempo de envio', 'Sales', 'Quantity', 'Profit', 'Region', 'State', 'Order ID-1', 'Ship Mode',
+                 'Customer ID', 'Customer Name', 'Segment', 'Country', 'City', 'Postal Code', 'Product ID-1',
+                 'Category', 'Sub-Category', 'Order Date', 'Ship Date', 'Discount', 'Product Name',
+                 'Return Reason', 'es devolución?', 'Notas devolución', 'Aprobador']
+
+# --- coffee-shop transactions ------------------------------------------------
+# store_id -> (store_location, state store location)
+COFFEE_STORES = {3: ('Astoria', 'MOTUL'), 5: ('Lower Manhattan', 'MERIDA'), 8: ("Hell's Kitchen", 'TICUL')}
+# Spellings the location join has to clean up (see coffee_data.attach_locations)
+DIRTY_LOCATIONS = {'TICUL': 'Ticul ', 'MERIDA': 'merida', 'MOTUL': 'Motul'}
+DIRTY_SHARE = 0.05
+# product_type -> (product_category, weight, price of the regular size)
+COFFEE_PRODUCTS = {
+    'Brewed Chai tea': ('Tea', 17, 3.0), 'Gourmet brewed coffee': ('Coffee', 17, 2.5),
+    'Barista Espresso': ('Coffee', 16, 3.5), 'Hot chocolate': ('Drinking Chocolate', 11, 4.5),
+    'Brewed Black tea': ('Tea', 11, 2.75), 'Brewed herbal tea': ('Tea', 11, 2.75),
+    'Scone': ('Bakery', 10, 3.5), 'Organic brewed coffee': ('Coffee', 8, 3.0),
+    'Drip coffee': ('Coffee', 8, 2.5), 'Premium brewed coffee': ('Coffee', 6, 3.25),
+    'Biscotti': ('Bakery', 5, 3.5), 'Pastry': ('Bakery', 5, 3.75),
+    'Regular syrup': ('Flavours', 3, 0.8), 'Sugar free syrup': ('Flavours', 1.5, 0.8),
+    'Premium Beans': ('Coffee beans', 0.5, 30.0), 'Organic Beans': ('Coffee beans', 0.3, 20.0),
+    'Clothing': ('Branded', 0.15, 25.0), 'Loose Tea': ('Loose Tea', 0.7, 9.0),
+    'Drinking Chocolate': ('Packaged Chocolate', 0.3, 11.0),
+}
+PRODUCTS_PER_TYPE = 4
+SIZES = [('Sm', 0.85), ('Rg', 1.0), ('Lg', 1.2)]
+# Transactions per opening hour (06:00-20:00): morning rush, then a slow decline
+COFFEE_HOURS = np.array([4, 9, 12, 12, 10, 8, 7, 7, 7, 7, 7, 6, 5, 4, 1], dtype=float)
+COFFEE_COLUMNS = ['transaction_id', 'transaction_date', 'transaction_time', 'transaction_qty', 'store_id',
+                  'store_location', 'product_id', 'unit_price', 'product_category', 'product_type',
+                  'product_detail', 'state store location']
+
+# --- BTS on-time flights -----------------------------------------------------
+AIRLINES = (['AA', 'UA', 'DL', 'B6', 'TW', 'VX', 'AS', 'HP'],
+            [0.38, 0.2, 0.18, 0.09, 0.065, 0.045, 0.02, 0.02])
+DEPARTURE_HOURS = np.array([0, 0, 0, 0, 0, 0, 6, 8, 8, 7, 6, 6, 6, 5, 5, 5, 5, 5, 5, 4, 3, 4, 5, 6], dtype=float)
+# Block time LAX -> JFK plus the three hours of time zone difference
+BLOCK_MINUTES = 320 + 180
+CANCELLED_SHARE = 0.015
+FLIGHT_COLUMNS = ['Month', 'DayOfWeek', 'FlightDate', 'Reporting_Airline', 'Origin', 'Dest', 'CRSDepTime',
+                  'CRSArrTime', 'DepTime', 'ArrTime', 'ArrDelay', 'ArrDelayMinutes', 'CarrierDelay',
+                  'WeatherDelay', 'NASDelay', 'SecurityDelay', 'LateAircraftDelay', 'DepDelay',
+                  'DepDelayMinutes', 'DivDistance', 'DivArrDelay']
+CAUSES = ['CarrierDelay', 'WeatherDelay', 'NASDelay', 'SecurityDelay', 'LateAircraftDelay']
+CAUSE_WEIGHTS = np.array([3.0, 0.3, 4.0, 0.1, 2.5])
+
+# Seconds of the day / minutes of the day as text, built once and indexed by value
+_CLOCK = np.array([f'{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}' for s in range(86400)], dtype=object)
+_HHMM = np.array([f'{m // 60:02d}{m % 60:02d}' for m in range(1440)] + ['2400'], dtype=object)
+
+
+def _pick(rng, choices, size):
+    values, weights = choices
+    weights = np.asarray(weights, dtype=float)
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size, p=weights / weights.sum())]
+
+
+def _dates(rng, start, end, size, yearly_growth=0.15, month_weights=None):
+    """Random days in [start, end] with year-on-year growth and monthly seasonality."""
+    days = pd.date_range(start, end, freq='D')
+    weights = (1 + yearly_growth) ** (days.year - days.year[0])
+    if month_weights is not None:
+        weights = weights * np.asarray(month_weights)[days.month - 1]
+    weights = np.asarray(weights, dtype=float)
+    return days[rng.choice(len(days), size, p=weights / weights.sum())]
+
+
+def _text(*parts):
+    """Element-wise concatenation of arrays/scalars into an object array of str."""
+    out = ''
+    for part in parts:
+        out = out + (part if isinstance(part, str) else pd.Series(np.asarray(part)).astype(str))
+    return out.to_numpy(dtype=object)
+
+
+class SalesGenerator:
+    """Superstore-style order lines with the columns of SalidaFinal.xlsx.
+
+    Customers and the product catalog are drawn once per seed; chunks then
+    draw orders (2-4 lines on average) with seasonal dates, Zipf product
+    popularity, ship modes with matching shipping times, discounts that can
+    turn a line unprofitable, and ~4 % of orders returned.
+    """
+
+    def __init__(self, rows, seed=0):
+        rng = np.random.default_rng(seed)
+        self.rng = np.random.default_rng([seed, 1])
+        self.next_order = 100000
+
+        states = [(region, state) for region, names in REGIONS.items() for state in names]
+        self.cities = pd.DataFrame([(region, state, city) for region, state in states
+                                    for city in CITY_NAMES[:max(2, int(STATE_WEIGHTS.get(state, 1) * 2))]],
+                                   columns=['Region', 'State', 'City'])
+        city_weight = self.cities['State'].map(lambda s: STATE_WEIGHTS.get(s, 1)).to_numpy()
+        city_weight = city_weight / self.cities.groupby('State')['City'].transform('size').to_numpy()
+        self.city_p = city_weight / city_weight.sum()
+        self.cities['Postal Code'] = rng.integers(1000, 99950, len(self.cities)).astype(float)
+
+        n_customers = max(800, rows // 20)
+        first = rng.integers(0, len(FIRST_NAMES), n_customers)
+        last = rng.integers(0, len(LAST_NAMES), n_customers)
+        initials = (np.array([n[0] for n in FIRST_NAMES], dtype=object)[first]
+                    + np.array([n[0] for n in LAST_NAMES], dtype=object)[last])
+        self.customers = pd.DataFrame({
+            'Customer ID': _text(initials, '-', 10000 + np.arange(n_customers)),
+            'Customer Name': _text(np.array(FIRST_NAMES, dtype=object)[first], ' ',
+                                   np.array(LAST_NAMES, dtype=object)[last]),
+            'Segment': _pick(rng, SEGMENTS, n_customers),
+            'city': rng.choice(len(self.cities), n_customers, p=self.city_p),
+        })
+
+        n_products = max(1850, rows // 100)
+        subs = list(SUB_CATEGORIES)
+        sub_weights = np.array([SUB_CATEGORIES[s][1] for s in subs], dtype=float)
+        sub = rng.choice(len(subs), n_products, p=sub_weights / sub_weights.sum())
+        sub_names = np.array(subs, dtype=object)[sub]
+        categories = np.array([SUB_CATEGORIES[s][0] for s in subs], dtype=object)[sub]
+        self.products = pd.DataFrame({
+            'Product ID-1': _text(pd.Series(categories).str[:3].str.upper(), '-',
+                                  pd.Series(sub_names).str[:2].str.upper(), '-', 10000000 + np.arange(n_products)),
+            'Category': categories,
+            'Sub-Category': sub_names,
+            'Product Name': _text(np.array(BRANDS, dtype=object)[rng.integers(0, len(BRANDS), n_products)],
+                                  ' ', sub_names, ' ', rng.integers(100, 9999, n_products)),
+            'price': np.array([SUB_CATEGORIES[s][2] for s in subs])[sub] * rng.lognormal(0, 0.6, n_products),
+            'margin': np.array([SUB_CATEGORIES[s][3] for s in subs])[sub] + rng.normal(0, 0.08, n_products),
+        })
+        # Zipf-like popularity over a shuffled catalog
+        popularity = 1 / np.arange(1, n_products + 1) ** 0.8
+        self.product_p = rng.permutation(popularity / popularity.sum())
+
+    def chunk(self, size):
+        rng = self.rng
+        # Orders: sizes ~ 1 + Poisson(2.3), truncated to the chunk
+        lines = 1 + rng.poisson(2.3, size // 2 + 1)
+        n_orders = np.searchsorted(np.cumsum(lines), size) + 1
+        lines = lines[:n_orders]
+        lines[-1] -= lines.sum() - size
+        order = np.repeat(np.arange(n_orders), lines)
+
+        order_dates = _dates(rng, '2015-01-01', '2018-12-31', n_orders,
+                             month_weights=[0.6, 0.5, 1, 0.9, 0.9, 0.9, 0.9, 0.9, 1.8, 1.1, 1.9, 1.9])
+        customer = rng.integers(0, len(self.customers), n_orders)
+        modes = list(SHIP_MODES)
+        mode = rng.choice(len(modes), n_orders, p=[SHIP_MODES[m][0] for m in modes])
+        low = np.array([SHIP_MODES[m][1] for m in modes])[mode]
+        high = np.array([SHIP_MODES[m][2] for m in modes])[mode]
+        ship_days = rng.integers(low, high + 1)
+        returned = rng.random(n_orders) < RETURN_SHARE
+        order_ids = _text('CA-', order_dates.year, '-', self.next_order + np.arange(n_orders))
+        self.next_order += n_orders
+
+        customers = self.customers.iloc[customer[order]].reset_index(drop=True)
+        # Most orders ship to the customer's city, some elsewhere
+        cities = self.cities.iloc[np.where(rng.random(n_orders) < 0.8,
+                                           self.customers['city'].to_numpy()[customer],
+                                           rng.choice(len(self.cities), n_orders, p=self.city_p))[order]]
+        products = self.products.iloc[rng.choice(len(self.products), size, p=self.product_p)]
+
+        quantity = _pick(rng, QUANTITIES, size).astype('int64')
+        discount = _pick(rng, DISCOUNTS, size).astype(float)
+        price = products['price'].to_numpy()
+        rate = np.nan_to_num(discount)
+        sales = np.round(price * quantity * (1 - rate), 4)
+        profit = np.round(sales * products['margin'].to_numpy() - price * quantity * rate * 0.5, 4)
+
+        line_returned = returned[order]
+        reason = np.where(line_returned, _pick(rng, (RETURN_REASONS, [8, 4, 4, 3, 2, 1]), size), None)
+        approved = line_returned & (rng.random(size) < 0.55)
+        noted = approved & (rng.random(size) < 0.3)
+
+        df = pd.DataFrame({
+            'Tiempo de envio': ship_days[order].astype('int64'),
+            'Sales': sales,
+            'Quantity': quantity,
+            'Profit': profit,
+            'Region': cities['Region'].to_numpy(),
+            'State': cities['State'].to_numpy(),
+            'Order ID-1': order_ids[order],
+            'Ship Mode': np.array(modes, dtype=object)[mode][order],
+            'Customer ID': customers['Customer ID'].to_numpy(),
+            'Customer Name': customers['Customer Name'].to_numpy(),
+            'Segment': customers['Segment'].to_numpy(),
+            'Country': 'United States',
+            'City': cities['City'].to_numpy(),
+            'Postal Code': cities['Postal Code'].to_numpy(),
+            'Product ID-1': products['Product ID-1'].to_numpy(),
+            'Category': products['Category'].to_numpy(),
+            'Sub-Category': products['Sub-Category'].to_numpy(),
+            'Order Date': order_dates[order],
+            'Ship Date': (order_dates + pd.to_timedelta(ship_days, unit='D'))[order],
+            'Discount': discount,
+            'Product Name': products['Product Name'].to_numpy(),
+            'Return Reason': reason,
+            'es devolución?': np.where(line_returned, 'Si', 'No'),
+            'Notas devolución': np.where(noted, _pick(rng, (RETURN_NOTES, [1] * len(RETURN_NOTES)), size), None),
+            'Aprobador': np.where(approved, _pick(rng, (APPROVERS, [1] * len(APPROVERS)), size), None),
+        })
+        return df[SALES_COLUMNS]
+
+
+class CoffeeGenerator:
+    """Coffee-shop transactions like 'Coffee Shop Sales_Modified.xlsx'.
+
+    Three stores mapped to Yucatán locations (with a few dirty spellings),
+    a catalog of sized products per product_type, opening hours with a
+    morning rush and a first-half-of-2023 calendar that grows month by month.
+    """
+
+    def __init__(self, rows, seed=0):
+        self.rng = np.random.default_rng([seed, 2])
+        self.next_id = 1
+        catalog = []
+        for product_type, (category, weight, price) in COFFEE_PRODUCTS.items():
+            for n in range(PRODUCTS_PER_TYPE):
+                size, factor = SIZES[n % len(SIZES)]
+                detail = f'{product_type} {size}' if n < len(SIZES) else f'{product_type} Special'
+                catalog.append((category, product_type, detail, round(price * factor, 2), weight))
+        self.catalog = pd.DataFrame(catalog, columns=['product_category', 'product_type', 'product_detail',
+                                                      'unit_price', 'weight'])
+        self.catalog['product_id'] = np.arange(1, len(self.catalog) + 1)
+        self.catalog_p = (self.catalog['weight'] / self.catalog['weight'].sum()).to_numpy()
+
+    def chunk(self, size):
+        rng = self.rng
+        dates = _dates(rng, '2023-01-01', '2023-06-30', size, yearly_growth=0,
+                       month_weights=[0.7, 0.7, 0.9, 1.1, 1.5, 1.6])
+        hours = 6 + rng.choice(len(COFFEE_HOURS), size, p=COFFEE_HOURS / COFFEE_HOURS.sum())
+        seconds = hours * 3600 + rng.integers(0, 3600, size)
+        order = np.argsort(dates.to_numpy().astype('int64') * 86400 + seconds, kind='stable')
+        dates, seconds = dates[order], seconds[order]
+
+        store_ids = np.array(list(COFFEE_STORES))
+        store = store_ids[rng.integers(0, len(store_ids), size)]
+        location = pd.Series(store).map({k: v[1] for k, v in COFFEE_STORES.items()})
+        dirty = rng.random(size) < DIRTY_SHARE
+        location = location.where(~dirty, location.map(DIRTY_LOCATIONS))
+        products = self.catalog.iloc[rng.choice(len(self.catalog), size, p=self.catalog_p)]
+
+        df = pd.DataFrame({
+            'transaction_id': self.next_id + np.arange(size),
+            'transaction_date': dates,
+            'transaction_time': _CLOCK[seconds],
+            'transaction_qty': np.where(rng.random(size) < 0.6, 1, rng.integers(2, 5, size)),
+            'store_id': store,
+            'store_location': pd.Series(store).map({k: v[0] for k, v in COFFEE_STORES.items()}).to_numpy(),
+            'product_id': products['product_id'].to_numpy(),
+            'unit_price': products['unit_price'].to_numpy(),
+            'product_category': products['product_category'].to_numpy(),
+            'product_type': products['product_type'].to_numpy(),
+            'product_detail': products['product_detail'].to_numpy(),
+            'state store location': location.to_numpy(),
+        })
+        self.next_id += size
+        return df[COFFEE_COLUMNS]
+
+
+class FlightGenerator:
+    """BTS on-time rows with the schema of datos/lax_to_jfk.csv.
+
+    Scheduled departures follow a daily profile; departure delays mix
+    on-time noise with a long exponential tail, arrival delays follow
+    them, and cause minutes (reported from June 2003, delays >= 15 min)
+    split the arrival delay. ~1.5 % of flights are cancelled (all NA).
+    """
+
+    def __init__(self, rows, seed=0, origin='LAX', dest='JFK', start='2003-01-01', end='2020-12-31'):
+        self.rng = np.random.default_rng([seed, 3])
+        self.origin, self.dest, self.start, self.end = origin, dest, start, end
+
+    def chunk(self, size):
+        rng = self.rng
+        dates = _dates(rng, self.start, self.end, size, yearly_growth=0.02,
+                       month_weights=[0.9, 0.8, 1, 1, 1, 1.1, 1.15, 1.15, 0.95, 1, 0.95, 1])
+        dep_hour = rng.choice(24, size, p=DEPARTURE_HOURS / DEPARTURE_HOURS.sum())
+        crs_dep = dep_hour * 60 + rng.integers(0, 12, size) * 5
+        crs_arr = (crs_dep + BLOCK_MINUTES + rng.integers(-20, 21, size)) % 1440
+
+        late = rng.random(size) < 0.2
+        dep_delay = np.where(late, rng.exponential(40, size), np.maximum(rng.normal(-3, 5, size), -19)).round()
+        arr_delay = (dep_delay + rng.normal(-8, 12, size)).round()
+        cancelled = rng.random(size) < CANCELLED_SHARE
+        dep_time = (crs_dep + dep_delay).astype(int) % 1440
+        arr_time = (crs_arr + arr_delay).astype(int) % 1440
+
+        # Cause minutes split ArrDelay, only for delays of 15 minutes or more
+        reported = (~cancelled) & (arr_delay >= 15) & (dates >= pd.Timestamp('2003-06-01'))
+        shares = rng.dirichlet(CAUSE_WEIGHTS, size)
+        causes = np.floor(shares * np.maximum(arr_delay, 0)[:, None])
+        causes[:, 2] += np.maximum(arr_delay, 0) - causes.sum(axis=1)
+
+        def nullable(values, mask):
+            return pd.array(np.where(mask, np.nan, values), dtype='Float64').astype('Int64')
+
+        df = pd.DataFrame({
+            'Month': dates.month.astype('int64'),
+            'DayOfWeek': (dates.dayofweek + 1).astype('int64'),
+            'FlightDate': dates.strftime('%Y-%m-%d'),
+            'Reporting_Airline': _pick(rng, AIRLINES, size),
+            'Origin': self.origin,
+            'Dest': self.dest,
+            'CRSDepTime': _HHMM[crs_dep],
+            'CRSArrTime': _HHMM[crs_arr],
+            'DepTime': np.where(cancelled, None, _HHMM[dep_time]),
+            'ArrTime': np.where(cancelled, None, _HHMM[arr_time]),
+            'ArrDelay': nullable(arr_delay, cancelled),
+            'ArrDelayMinutes': nullable(np.maximum(arr_delay, 0), cancelled),
+            **{col: nullable(causes[:, i], ~reported) for i, col in enumerate(CAUSES)},
+            'DepDelay': nullable(dep_delay, cancelled),
+            'DepDelayMinutes': nullable(np.maximum(dep_delay, 0), cancelled),
+            'DivDistance': pd.array([pd.NA] * size, dtype='Int64'),
+            'DivArrDelay': pd.array([pd.NA] * size, dtype='Int64'),
+        })
+        return df[FLIGHT_COLUMNS]
+
+
+GENERATORS = {'sales': SalesGenerator, 'coffee': CoffeeGenerator, 'flights': FlightGenerator}
+
+
+def generate(kind, rows, seed=0, chunk_rows=CHUNK_ROWS, **kwargs):
+    """Yield DataFrames of at most `chunk_rows` rows, `rows` in total."""
+    generator = GENERATORS[kind](rows, seed=seed, **kwargs)
+    for start in range(0, rows, chunk_rows):
+        yield generator.chunk(min(chunk_rows, rows - start))
+
+
+def write(kind, rows, path, seed=0, chunk_rows=CHUNK_ROWS, **kwargs):
+    """Generate `rows` rows of `kind` into path (.parquet, .csv or .xlsx)."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.xlsx' and rows > EXCEL_MAX_ROWS:
+        raise ValueError(f"Un .xlsx admite como máximo {EXCEL_MAX_ROWS:,} filas; usa .parquet o .csv")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    chunks = generate(kind, rows, seed=seed, chunk_rows=chunk_rows, **kwargs)
+    tmp = path.with_name(path.name + '.tmp')
+    if suffix == '.parquet':
+        writer = None
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema)
+            writer.write_table(table.cast(writer.schema))
+        if writer is not None:
+            writer.close()
+    elif suffix == '.csv':
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(tmp, mode='w' if i == 0 else 'a', header=i == 0, index=False, na_rep='NA')
+    elif suffix == '.xlsx':
+        pd.concat(chunks, ignore_index=True).to_excel(tmp, index=False, engine='openpyxl')
+    else:
+        raise ValueError(f"Formato no soportado: '{suffix}'")
+    tmp.replace(path)
+    return path
+
+
+if __name__ == '__main__':
+    # python synthetic.py sales 10000000 .cache/synthetic/ventas.parquet
+    parser = argparse.ArgumentParser(description='Genera datos sintéticos para pruebas de carga.')
+    parser.add_argument('kind', choices=list(GENERATORS))
+    parser.add_argument('rows', type=int)
+    parser.add_argument('path', type=Path, help='.parquet, .csv o .xlsx')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+    print(write(args.kind, args.rows, args.path, seed=args.seed, chunk_rows=args.chunk_rows))
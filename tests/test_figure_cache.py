@@ -0,0 +1,40 @@
+import json
+
+from streamlit.testing.v1 import AppTest
+
+
+def _app(cached):
+    import pandas as pd
+    import plotly.express as px
+    import streamlit as st
+
+    from figure_cache import cached_figure
+
+    data = pd.DataFrame({'Region': ['Central', 'East', 'South', 'West'], 'Sales': [501.2, 678.8, 391.7, 725.5]})
+    params = dict(x='Region', y='Sales', title='Ventas por Región')
+    if cached:
+        fig = cached_figure(px.bar, data, layout=dict(showlegend=False), **params)
+    else:
+        fig = px.bar(data, **params)
+        fig.update_layout(showlegend=False)
+    st.plotly_chart(fig)
+
+
+def _rendered_spec(cached):
+    at = AppTest.from_function(_app, args=(cached,)).run()
+    assert not at.exception
+    charts = at.get('plotly_chart')
+    assert len(charts) == 1
+    return json.loads(charts[0].proto.spec)
+
+
+def test_cached_figure_renders_like_plotly_chart():
+    # PreserializedFigure skips BaseFigure.__init__ and relies on st.plotly_chart
+    # asking BaseFigure instances for to_dict(): an upgrade that stops doing so
+    # must fail here instead of shipping empty charts
+    expected = _rendered_spec(cached=False)
+    for _ in range(2):  # miss, then hit of the shared figure cache
+        spec = _rendered_spec(cached=True)
+        assert spec['data'] == expected['data']
+        assert spec['layout'] == expected['layout']
+        assert spec['data'][0]['x'] == ['Central', 'East', 'South', 'West']
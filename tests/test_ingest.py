@@ -0,0 +1,29 @@
+from pathlib import Path
+
+import pytest
+
+import ingest
+from data_cache import read_excel
+
+SOURCE = Path(__file__).resolve().parents[1] / 'SalidaFinal.xlsx'
+
+
+def test_append_fills_a_column_empty_so_far(tmp_path, monkeypatch):
+    # 'Notas devolución' is empty in the first 300 rows of SalidaFinal.xlsx:
+    # read as float64 then, as str once rows 300-400 fill it. The digest of the
+    # first 300 rows must not change with that, or the store is rebuilt
+    monkeypatch.setattr(ingest, 'CACHE_DIR', tmp_path / 'cache')
+    rows = read_excel(SOURCE)
+    assert rows['Notas devolución'].iloc[:300].isna().all()
+    assert rows['Notas devolución'].iloc[300:400].notna().any()
+
+    workbook = tmp_path / 'ventas.xlsx'
+    rows.iloc[:300].to_excel(workbook, index=False)
+    store = ingest.SalesStore(workbook)
+    assert store.refresh() == 300
+
+    rows.iloc[:400].to_excel(workbook, index=False)
+    assert store.refresh() == 100
+    assert len(store._load_state()['parts']) == 2
+    assert len(store.frame()) == 400
+    assert store.cube().totals()['Sales'] == pytest.approx(rows['Sales'].iloc[:400].sum())
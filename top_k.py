@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_cache import file_signature
+from registry import dataset_for_path
+
+
+class _Cells:
+    """Measure sums per (partition, [day,] item), sorted so each partition
+    (and, inside it, each day range) is one contiguous slice."""
+
+    def __init__(self, frame, measures, by_day):
+        keys = ['_part', '_day', '_item'] if by_day else ['_part', '_item']
+        cells = frame.groupby(keys, sort=True)[measures].sum().reset_index()
+        self.parts = cells['_part'].to_numpy()
+        self.days = cells['_day'].to_numpy() if by_day else None
+        self.items = cells['_item'].to_numpy()
+        self.values = {m: cells[m].to_numpy() for m in measures}
+
+    def offsets(self, n_parts):
+        return np.searchsorted(self.parts, np.arange(n_parts + 1))
+
+
+class TopK:
+    """Per-item totals for top-N panels, pre-aggregated by filter partition.
+
+    Rows are summed once per partition (one combination of the filter
+    columns' values) and item, plus per partition, day and item for date
+    ranges. A query takes the slices of the selected partitions (narrowed to
+    the dates by binary search), adds them up per item with np.bincount and
+    picks the best k with np.partition: no groupby or full sort at rerun
+    time, and only the selected cells are touched. Unfiltered totals are
+    precomputed.
+    """
+
+    def __init__(self, df, item, measures, partitions=(), date_column=None):
+        self.item = item
+        self.measures = list(measures)
+        self.partitions = list(partitions)
+        item_codes, self.items = pd.factorize(df[item], sort=True)  # same order as groupby
+        self.levels = {}  # partition column -> {value: code}
+        codes = []
+        for col in self.partitions:
+            col_codes, values = pd.factorize(df[col])
+            self.levels[col] = {value: code for code, value in enumerate(values)}
+            codes.append(col_codes)
+        self.shape = tuple(len(self.levels[col]) for col in self.partitions)
+        frame = pd.DataFrame({'_item': item_codes})
+        frame['_part'] = np.ravel_multi_index(codes, self.shape) if codes else 0
+        if date_column is not None:
+            frame['_day'] = pd.to_datetime(df[date_column]).dt.normalize().to_numpy().astype('datetime64[us]')
+        for measure in self.measures:
+            frame[measure] = df[measure].to_numpy(dtype='float64')
+        # Rows without an item (or a partition value) are left out, as groupby does
+        valid = item_codes >= 0
+        for col_codes in codes:
+            valid &= col_codes >= 0
+        frame = frame[valid]
+
+        n_parts = int(np.prod(self.shape))
+        self.cells = _Cells(frame, self.measures, by_day=False)
+        self.offsets = self.cells.offsets(n_parts)
+        self.day_cells = _Cells(frame, self.measures, by_day=True) if date_column is not None else None
+        self.day_offsets = self.day_cells.offsets(n_parts) if date_column is not None else None
+        self.present = np.bincount(self.cells.items, minlength=len(self.items)) > 0
+        self.totals_all = {m: np.bincount(self.cells.items, weights=self.cells.values[m], minlength=len(self.items))
+                           for m in self.measures}
+
+    def _selected_parts(self, filters):
+        # Partition ids for {column: values}; None = no column filters
+        selected, filtering = [], False
+        for col in self.partitions:
+            levels = self.levels[col]
+            values = (filters or {}).get(col)
+            if values is None:
+                selected.append(np.arange(len(levels)))
+                continue
+            codes = sorted({levels[value] for value in values if value in levels})
+            filtering |= len(codes) < len(levels)
+            selected.append(np.array(codes, dtype=np.int64))
+        if not filtering:
+            return None
+        grid = np.meshgrid(*selected, indexing='ij')
+        return np.ravel_multi_index([g.ravel() for g in grid], self.shape)
+
+    def _cell_positions(self, filters=None, start_date=None, end_date=None):
+        """(cells, positions of the selected cells), or None when nothing filters."""
+        parts = self._selected_parts(filters)
+        dated = self.day_cells is not None and (start_date is not None or end_date is not None)
+        if parts is None and not dated:
+            return None
+        if parts is None:
+            parts = np.arange(len(self.offsets) - 1)
+        cells, offsets = (self.day_cells, self.day_offsets) if dated else (self.cells, self.offsets)
+        lo, hi = offsets[parts], offsets[parts + 1]
+        if dated:
+            # Inside a partition the cells are sorted by day: narrow each slice by binary search
+            start = np.datetime64(pd.Timestamp(start_date), 'us') if start_date is not None else None
+            end = np.datetime64(pd.Timestamp(end_date), 'us') if end_date is not None else None
+            for i, (a, b) in enumerate(zip(lo.tolist(), hi.tolist())):
+                days = cells.days[a:b]
+                if start is not None:
+                    lo[i] = a + np.searchsorted(days, start, side='left')
+                if end is not None:
+                    hi[i] = a + np.searchsorted(days, end, side='right')
+        lengths = np.maximum(hi - lo, 0)
+        # Concatenated aranges lo[i]..hi[i] without a Python loop over the cells
+        starts = np.repeat(lo - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+        return cells, starts + np.arange(lengths.sum())
+
+    def totals(self, measure, filters=None, start_date=None, end_date=None):
+        """(per-item totals, per-item presence) for the selection, indexed by item code."""
+        selection = self._cell_positions(filters, start_date, end_date)
+        if selection is None:
+            return self.totals_all[measure], self.present
+        cells, positions = selection
+        items = cells.items[positions]
+        totals = np.bincount(items, weights=cells.values[measure][positions], minlength=len(self.items))
+        return totals, np.bincount(items, minlength=len(self.items)) > 0
+
+    def top(self, k, measure, filters=None, start_date=None, end_date=None):
+        """The k items with the largest `measure` under the filters.
+
+        Same result as df[filtered].groupby(item)[measure].sum().nlargest(k):
+        a Series indexed by item, largest first, ties kept in item order.
+        `filters` is {partition column: selected values}; the date range is
+        inclusive.
+        """
+        totals, present = self.totals(measure, filters, start_date, end_date)
+        # Only items present in the selection rank (even above negative totals)
+        candidates = np.flatnonzero(present)
+        values = totals[candidates]
+        k = min(k, len(candidates))
+        if k <= 0:
+            chosen = np.array([], dtype=np.int64)
+        else:
+            kth = np.partition(values, len(values) - k)[len(values) - k]
+            above = candidates[values > kth]
+            tied = candidates[values == kth][:k - len(above)]
+            chosen = np.concatenate([above, tied])
+            chosen = chosen[np.lexsort((chosen, -totals[chosen]))]
+        return pd.Series(totals[chosen], index=pd.Index(self.items[chosen], name=self.item), name=measure)
+
+
+@st.cache_resource(show_spinner=False)
+def _load_top_k(file_path, signature, item, measures, partitions, date_column):
+    columns = [item, *measures, *partitions] + ([date_column] if date_column is not None else [])
+    return TopK(dataset_for_path(file_path, columns=columns), item, measures, partitions, date_column)
+
+
+def load_top_k(file_path, item='Product Name', measures=('Sales', 'Profit'), partitions=('Region', 'Category'),
+               date_column='Order Date'):
+    """TopK of a sales workbook, built once per workbook version and shared across sessions."""
+    return _load_top_k(file_path, file_signature(file_path), item, tuple(measures), tuple(partitions), date_column)
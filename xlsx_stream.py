@@ -0,0 +1,438 @@
+import re
+import zipfile
+from functools import cached_property
+from posixpath import join, normpath
+from xml.etree.ElementTree import iterparse, parse
+
+import numpy as np
+import pandas as pd
+
+# Rows turned into typed arrays at a time; bounds the Python objects alive while parsing
+BATCH_ROWS = 16_384
+# Text read as missing: pd.read_excel's default na_values
+NA_VALUES = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+})
+
+_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_STRICT = '{http://purl.oclc.org/ooxml/spreadsheetml/main}'
+_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# Built-in number formats that display dates/times (ECMA-376 18.8.30)
+_DATE_FORMAT_IDS = set(range(14, 23)) | set(range(27, 37)) | set(range(45, 48)) | set(range(50, 59))
+_EPOCH_1900 = np.datetime64('1899-12-30', 'us')
+_EPOCH_1904 = np.datetime64('1904-01-01', 'us')
+_MS_PER_DAY = 86_400_000
+_US_PER_DAY = _MS_PER_DAY * 1000
+# 'A' -> 0, 'AB' -> 27...
+_COLUMN_INDEX = {}
+
+
+class _ExcelDate(float):
+    """Serial number of a date-formatted cell (told apart only in mixed columns)."""
+
+
+def _is_date_format(code):
+    # Drop quoted literals, escapes and [colour]/[$-locale] sections before looking for d/m/y
+    code = re.sub(r'"[^"]*"|\\.|\[[^\]]*\]', '', code).lower()
+    return bool(re.search(r'[dy]', code)) or ('m' in code and not re.search(r'[hs]', code))
+
+
+def _column_index(letters):
+    index = _COLUMN_INDEX.get(letters)
+    if index is None:
+        index = 0
+        for char in letters:
+            index = index * 26 + ord(char) - 64
+        index = _COLUMN_INDEX[letters] = index - 1
+    return index
+
+
+class _Workbook:
+    """Package parts of an .xlsx: sheet targets, shared strings and date styles."""
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.names = names = set(archive.namelist())
+        workbook = self._parse('xl/workbook.xml')
+        self.ns = ns = _STRICT if workbook.tag.startswith(_STRICT) else _MAIN
+        rels = {}
+        if 'xl/_rels/workbook.xml.rels' in names:
+            for rel in self._parse('xl/_rels/workbook.xml.rels').iter(f'{_PKG_REL}Relationship'):
+                target = rel.get('Target', '')
+                target = target.lstrip('/') if target.startswith('/') else normpath(join('xl', target))
+                rels[rel.get('Id')] = (rel.get('Type', '').rsplit('/', 1)[-1], target)
+        self.sheets = []
+        for sheet in workbook.iter(f'{ns}sheet'):
+            rid = next((v for k, v in sheet.attrib.items() if k.endswith('}id')), None)
+            self.sheets.append((sheet.get('name'), rels.get(rid, (None, None))[1]))
+        props = workbook.find(f'{ns}workbookPr')
+        date1904 = props is not None and props.get('date1904') in ('1', 'true')
+        self.epoch = _EPOCH_1904 if date1904 else _EPOCH_1900
+
+        # Shared strings and styles are only parsed when a sheet is read
+        self.parts = {kind: target for kind, target in rels.values()}
+
+    @cached_property
+    def strings(self):
+        part = self.parts.get('sharedStrings', 'xl/sharedStrings.xml')
+        return self._shared_strings(part) if part in self.names else []
+
+    @cached_property
+    def date_styles(self):
+        part = self.parts.get('styles', 'xl/styles.xml')
+        return self._date_styles(part) if part in self.names else frozenset()
+
+    def _parse(self, part):
+        # Small parts only (workbook, rels, styles)
+        with self.archive.open(part) as stream:
+            return parse(stream).getroot()
+
+    def _shared_strings(self, part):
+        # Resolved once: sheet cells refer to them by position
+        ns = self.ns
+        si, t, r = f'{ns}si', f'{ns}t', f'{ns}r'
+        strings = []
+        with self.archive.open(part) as stream:
+            for _, elem in iterparse(stream):
+                if elem.tag == si:
+                    text = elem.findtext(t)
+                    if text is None:
+                        # Rich text: concatenate the runs (phonetic hints are skipped)
+                        text = ''.join(run.findtext(t) or '' for run in elem.iter(r))
+                    strings.append(text)
+                    elem.clear()
+        return strings
+
+    def _date_styles(self, part):
+        ns = self.ns
+        root = self._parse(part)
+        custom = {int(fmt.get('numFmtId')): fmt.get('formatCode', '') for fmt in root.iter(f'{ns}numFmt')}
+        cell_xfs = root.find(f'{ns}cellXfs')
+        dates = set()
+        for index, xf in enumerate(cell_xfs if cell_xfs is not None else []):
+            fmt = int(xf.get('numFmtId', 0))
+            if _is_date_format(custom[fmt]) if fmt in custom else fmt in _DATE_FORMAT_IDS:
+                dates.add(str(index))
+        return frozenset(dates)
+
+    def sheet_part(self, sheet_name):
+        if isinstance(sheet_name, int):
+            if not 0 <= sheet_name < len(self.sheets):
+                raise ValueError(f"Worksheet index {sheet_name} is invalid, {len(self.sheets)} worksheets found")
+            return self.sheets[sheet_name][1]
+        for name, target in self.sheets:
+            if name == sheet_name:
+                return target
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+
+def sheet_size(path, sheet_name=0):
+    """Uncompressed size in bytes of a sheet's XML (what a reader has to parse)."""
+    with zipfile.ZipFile(path) as archive:
+        return archive.getinfo(_Workbook(archive).sheet_part(sheet_name)).file_size
+
+
+def _dimension_width(workbook, part):
+    # Columns of the sheet's <dimension ref="A1:Y16303">, 0 when the writer left it out.
+    # pandas pads every row to the width of the whole sheet, not just of the rows read
+    dimension, sheet_data = f'{workbook.ns}dimension', f'{workbook.ns}sheetData'
+    with workbook.archive.open(part) as stream:
+        for _, elem in iterparse(stream, events=('start',)):
+            if elem.tag == dimension:
+                letters = elem.get('ref', '').split(':')[-1].rstrip('0123456789')
+                return _column_index(letters) + 1 if letters.isalpha() and letters.isupper() else 0
+            if elem.tag == sheet_data:
+                break
+    return 0
+
+
+def _iter_cells(workbook, part):
+    """(row number, [(column, value), ...]) per non-empty row of the sheet XML.
+
+    The XML is parsed incrementally and every row element is cleared once
+    read, so memory stays flat whatever the sheet size. Values are already
+    typed: str (shared/inline strings), float, _ExcelDate, bool or None.
+    """
+    ns = workbook.ns
+    row_tag, v_tag, is_tag = f'{ns}row', f'{ns}v', f'{ns}is'
+    strings, date_styles = workbook.strings, workbook.date_styles
+    na_values = NA_VALUES
+    position = 0
+    with workbook.archive.open(part) as stream:
+        for _, elem in iterparse(stream):
+            if elem.tag != row_tag:
+                continue
+            number = elem.get('r')
+            position = int(number) if number else position + 1
+            cells = []
+            column = -1
+            for cell in elem:
+                ref = cell.get('r')
+                column = _column_index(ref.rstrip('0123456789')) if ref else column + 1
+                kind = cell.get('t')
+                if kind == 'inlineStr':
+                    inline = cell.find(is_tag)
+                    text = '' if inline is None else ''.join(inline.itertext())
+                    value = None if text in na_values else text
+                else:
+                    text = cell.findtext(v_tag)
+                    if text is None:
+                        continue
+                    if kind is None or kind == 'n':
+                        value = float(text)
+                        if cell.get('s') in date_styles:
+                            value = _ExcelDate(value)
+                    elif kind == 's':
+                        value = strings[int(text)]
+                        if value in na_values:
+                            value = None
+                    elif kind == 'b':
+                        value = text == '1'
+                    elif kind == 'd':
+                        value = pd.Timestamp(text)
+                    else:  # 'str' (formula result) and 'e' (error)
+                        value = None if text in na_values else text
+                if value is not None:
+                    cells.append((column, value))
+            elem.clear()
+            yield position, cells
+
+
+def _to_datetime(serials, epoch):
+    # Excel serial days -> datetime64[us]; the time of day is rounded to the millisecond
+    # like openpyxl and calamine do
+    serials = np.asarray(serials, dtype='float64')
+    days = np.floor(serials)
+    micros = days * _US_PER_DAY + np.round((serials - days) * _MS_PER_DAY) * 1000
+    out = np.full(len(micros), np.datetime64('NaT'), dtype='datetime64[us]')
+    valid = ~np.isnan(micros)
+    out[valid] = epoch + micros[valid].astype('int64').astype('timedelta64[us]')
+    return out
+
+
+def _as_objects(kind, values):
+    # Mixed columns hold Python values, as pandas' openpyxl reader returns them
+    if kind == 'num':
+        return np.array([v if np.isnan(v) or not v.is_integer() else int(v) for v in values.tolist()],
+                        dtype=object)
+    if kind == 'date':
+        return np.array([np.nan if pd.isna(v) else pd.Timestamp(v) for v in values], dtype=object)
+    return values.astype(object)
+
+
+def _chunk(values, epoch):
+    """Typed array for one batch of a column: (kind, ndarray)."""
+    kinds = {type(v) for v in values if v is not None}
+    if not kinds:
+        return 'empty', np.full(len(values), np.nan)
+    if kinds == {float}:
+        return 'num', np.array(values, dtype='float64')
+    if kinds == {_ExcelDate}:
+        return 'date', _to_datetime([np.nan if v is None else v for v in values], epoch)
+    if kinds == {bool}:
+        if None in values:
+            # pandas reads booleans with gaps as 1.0/0.0/NaN
+            return 'bool_na', np.array([np.nan if v is None else float(v) for v in values])
+        return 'bool', np.array(values, dtype=bool)
+    out = np.empty(len(values), dtype=object)
+    dates = [i for i, v in enumerate(values) if type(v) is _ExcelDate]
+    stamps = _as_objects('date', _to_datetime([values[i] for i in dates], epoch))
+    out[dates] = stamps
+    for i, v in enumerate(values):
+        if v is None:
+            out[i] = np.nan
+        elif type(v) is float:
+            out[i] = int(v) if v.is_integer() else v
+        elif type(v) is not _ExcelDate:
+            out[i] = v
+    return 'object', out
+
+
+def _merge(chunks):
+    """One column from its batch chunks, typed like pd.read_excel would."""
+    kinds = {kind for kind, _ in chunks} - {'empty'}
+    if not chunks:
+        return np.array([], dtype='float64')
+    if kinds <= {'num'}:
+        values = np.concatenate([a for _, a in chunks])
+        if kinds and not np.isnan(values).any() and (values == np.round(values)).all() \
+                and np.abs(values).max(initial=0) < 2 ** 63:
+            return values.astype('int64')
+        return values
+    if kinds == {'date'}:
+        return np.concatenate([a if kind == 'date' else np.full(len(a), np.datetime64('NaT'), 'datetime64[us]')
+                               for kind, a in chunks])
+    if kinds == {'bool'}:
+        return np.concatenate([a for _, a in chunks])
+    if kinds <= {'bool', 'bool_na'}:
+        return np.concatenate([a.astype('float64') for _, a in chunks])
+    return np.concatenate([_as_objects(kind, a) for kind, a in chunks])
+
+
+def _header_names(cells, epoch):
+    # pandas names: blanks become 'Unnamed: i', repeated names get '.1', '.2'...
+    width = max((column for column, _ in cells), default=-1) + 1
+    found = dict(cells)
+    names, seen = [], {}
+    for i in range(width):
+        value = found.get(i)
+        if type(value) is _ExcelDate:
+            value = pd.Timestamp(_to_datetime([value], epoch)[0])
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        name = f'Unnamed: {i}' if value is None else value
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        names.append(name if count == 0 else f'{name}.{count}')
+    return names
+
+
+def _skip_test(skiprows):
+    if skiprows is None:
+        return lambda line: False
+    if callable(skiprows):
+        return skiprows
+    if isinstance(skiprows, int):
+        return lambda line: line < skiprows
+    if isinstance(skiprows, range) and skiprows.step == 1:
+        return lambda line: skiprows.start <= line < skiprows.stop
+    return set(skiprows).__contains__
+
+
+def _widen(names, keep, columns, width):
+    # Columns past the header are named 'Unnamed: i', as pandas does
+    for i in range(len(names), width):
+        names.append(f'Unnamed: {i}')
+        keep[i] = names[i]
+        columns[names[i]] = []
+
+
+def _iter_chunks(path, sheet_name, usecols, skiprows, nrows, batch_rows):
+    # (names, {name: (kind, ndarray)}) every `batch_rows` data rows; columns
+    # only ever get added, so a later batch may have more names than earlier ones
+    with zipfile.ZipFile(path) as archive:
+        workbook = _Workbook(archive)
+        part = workbook.sheet_part(sheet_name)
+        skip = _skip_test(skiprows)
+        names = keep = None
+        columns = {}
+        size = emitted = pending_blank = 0
+        first = previous = None
+        widest = _dimension_width(workbook, part)
+        for position, cells in _iter_cells(workbook, part):
+            if cells:
+                widest = max(widest, cells[-1][0] + 1)
+            # Line numbers as pandas counts them: from the first row of the sheet, blanks included
+            if first is None:
+                first = previous = position
+            line = position - first
+            if names is not None:
+                pending_blank += sum(1 for blank in range(previous - first + 1, line) if not skip(blank))
+            previous = position
+            if skip(line):
+                continue
+            if names is None:
+                names = _header_names(cells, workbook.epoch)
+                wanted = None if usecols is None else list(usecols)
+                if wanted is not None:
+                    missing = [c for c in wanted if not isinstance(c, int) and c not in names]
+                    if missing:
+                        raise ValueError(f"Usecols do not match columns, columns expected but not found: {missing}")
+                keep = {i: name for i, name in enumerate(names)
+                        if wanted is None or name in wanted or i in wanted}
+                columns = {name: [] for name in keep.values()}
+                if usecols is None:
+                    _widen(names, keep, columns, widest)
+                continue
+            if not cells:
+                pending_blank += 1
+                continue
+            if nrows is not None and emitted + pending_blank >= nrows:
+                break  # blank rows at the end of the window are dropped, as pandas does
+            # Blank rows between data rows become all-missing rows
+            size += pending_blank
+            emitted += pending_blank
+            pending_blank = 0
+            for column, value in cells:
+                name = keep.get(column)
+                if name is None:
+                    if usecols is not None:
+                        continue
+                    _widen(names, keep, columns, column + 1)
+                    name = keep[column]
+                values = columns[name]
+                if len(values) < size:
+                    values.extend([None] * (size - len(values)))
+                values.append(value)
+            size += 1
+            emitted += 1
+            if size >= batch_rows:
+                yield list(keep.values()), _batch(keep, columns, size, workbook.epoch)
+                columns = {name: [] for name in keep.values()}
+                size = 0
+        grew = False
+        if names is not None and usecols is None:
+            # Skipped rows count towards the sheet width too
+            grew = widest > len(names)
+            _widen(names, keep, columns, widest)
+        if names is not None and (size or emitted == 0 or grew):
+            yield list(keep.values()), _batch(keep, columns, size, workbook.epoch)
+
+
+def _batch(keep, columns, size, epoch):
+    out = {}
+    for name in keep.values():
+        values = columns[name]
+        values.extend([None] * (size - len(values)))
+        out[name] = _chunk(values, epoch)
+    return out
+
+
+def iter_batches(path, sheet_name=0, usecols=None, skiprows=None, nrows=None, batch_rows=BATCH_ROWS):
+    """Stream a sheet as DataFrames of at most `batch_rows` rows.
+
+    Same arguments as read_xlsx(). Each batch is typed on its own (a column
+    may be int64 in one batch and float64 in the next): use read_xlsx() to
+    get one consistently typed frame.
+    """
+    for names, batch in _iter_chunks(path, sheet_name, usecols, skiprows, nrows, batch_rows):
+        yield pd.DataFrame({name: _merge([batch[name]]) for name in names}, columns=names)
+
+
+def read_xlsx(path, sheet_name=0, usecols=None, skiprows=None, nrows=None, batch_rows=BATCH_ROWS):
+    """pd.read_excel-compatible reader for .xlsx built on the streaming parser.
+
+    The sheet XML is walked row by row (never loaded as a tree), shared
+    strings are resolved once, and every `batch_rows` rows the cells are
+    packed into typed arrays. `usecols` (names or positions), `skiprows`
+    (count, line numbers or callable; line 0 is the header) and `nrows`
+    follow pd.read_excel: skipped rows/columns are never converted and
+    parsing stops after `nrows`. Only header=0 is supported.
+    """
+    names, chunks, sizes = None, {}, []
+    for names, batch in _iter_chunks(path, sheet_name, usecols, skiprows, nrows, batch_rows):
+        size = len(next(iter(batch.values()))[1]) if batch else 0
+        for name, chunk in batch.items():
+            # A column first seen in this batch is missing in the earlier ones
+            previous = chunks.setdefault(name, [('empty', np.full(n, np.nan)) for n in sizes])
+            previous.append(chunk)
+        sizes.append(size)
+    if names is None:
+        return pd.DataFrame()
+    return pd.DataFrame({name: _merge(chunks[name]) for name in names}, columns=names)
+
+
+if __name__ == '__main__':
+    # python xlsx_stream.py workbook.xlsx [sheet]
+    import sys
+    import time
+
+    start = time.perf_counter()
+    sheet = sys.argv[2] if len(sys.argv) > 2 else '0'
+    sheet = int(sheet) if sheet.isdigit() else sheet
+    df = read_xlsx(sys.argv[1], sheet_name=sheet)
+    print(f"{sys.argv[1]}: {df.shape[0]:,} filas x {df.shape[1]} columnas en {time.perf_counter() - start:.2f} s "
+          f"({sheet_size(sys.argv[1], sheet) / 1e6:.1f} MB de XML)")
+    print(df.dtypes.to_string())